@@ -5,10 +5,12 @@ Combines friction signals into a composite index
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Optional
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
 from utils import (
     normalize_column, print_section_header, 
-    save_csv, calculate_percentile_rank
+    save_csv, njit
 )
 
 
@@ -20,6 +22,19 @@ WEIGHTS = {
     "TSD": 0.20   # Temporal Deviation
 }
 
+# Signal columns in the order used for the weight vector
+SIGNAL_COLUMNS = ['UIS', 'RIS', 'BSS', 'TSD']
+
+# Friction category boundaries (AFI 0-100) and their labels
+CATEGORY_BINS = np.array([20, 40, 60, 80], dtype=np.float64)
+CATEGORY_LABELS = [
+    "Very Low Friction",
+    "Low Friction",
+    "Moderate Friction",
+    "High Friction",
+    "Very High Friction"
+]
+
 
 def validate_signals(df: pd.DataFrame) -> bool:
     """
@@ -37,132 +52,237 @@ def validate_signals(df: pd.DataFrame) -> bool:
     if missing:
         raise ValueError(f"Missing required columns: {missing}")
     
-    # Check for negative values
-    signal_cols = ['UIS', 'RIS', 'BSS', 'TSD']
-    for col in signal_cols:
-        if (df[col] < 0).any():
+    # Check for negative values with one column-wise min (fmin ignores NaN)
+    col_mins = np.fmin.reduce(df[SIGNAL_COLUMNS].to_numpy(dtype=np.float64), axis=0)
+    for col, col_min in zip(SIGNAL_COLUMNS, col_mins):
+        if col_min < 0:
             raise ValueError(f"Negative values found in {col}")
     
     print("✓ Signal validation passed")
     return True
 
 
-def calculate_afi_raw(df: pd.DataFrame, weights: Dict[str, float] = WEIGHTS) -> pd.DataFrame:
+@lru_cache(maxsize=8)
+def validate_weights(weight_items: Tuple[Tuple[str, float], ...]) -> bool:
+    """
+    Validate that component weights sum to 1.0 (memoized per weight set)
+    
+    Args:
+        weight_items: Sorted (component, weight) pairs
+        
+    Returns:
+        True if valid, raises ValueError otherwise
+    """
+    weight_sum = sum(weight for _, weight in weight_items)
+    if not np.isclose(weight_sum, 1.0):
+        raise ValueError(f"Weights must sum to 1.0, got {weight_sum}")
+    return True
+
+
+@dataclass
+class AFIBuffers:
+    """
+    Working arrays shared by the AFI pipeline stages (one entry per record)
+    
+    Attributes:
+        signals: (N, 4) array of UIS, RIS, BSS, TSD
+        state_codes: Integer code of each record's state
+        afi_raw: Weighted sum of signals
+        afi: AFI normalized to 0-100
+        national_rank: Descending AFI rank across all records
+        state_rank: Descending AFI rank within the record's state
+        national_percentile: Percentile rank across all records (0-100)
+        category_codes: Index into CATEGORY_LABELS
+    """
+    signals: np.ndarray
+    state_codes: np.ndarray
+    afi_raw: Optional[np.ndarray] = None
+    afi: Optional[np.ndarray] = None
+    national_rank: Optional[np.ndarray] = None
+    state_rank: Optional[np.ndarray] = None
+    national_percentile: Optional[np.ndarray] = None
+    category_codes: Optional[np.ndarray] = None
+    
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'AFIBuffers':
+        """Extract the signal matrix and state codes from a signals DataFrame"""
+        return cls(
+            signals=np.ascontiguousarray(df[SIGNAL_COLUMNS].to_numpy()),
+            state_codes=pd.factorize(df['state'])[0]
+        )
+    
+    def to_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Attach the computed arrays to df as AFI columns"""
+        return df.assign(
+            AFI_raw=self.afi_raw,
+            AFI=self.afi,
+            national_rank=self.national_rank,
+            state_rank=self.state_rank,
+            national_percentile=self.national_percentile,
+            friction_category=pd.Categorical.from_codes(
+                self.category_codes, categories=CATEGORY_LABELS
+            )
+        )
+
+
+def calculate_afi_raw(buffers: AFIBuffers, weights: Dict[str, float] = WEIGHTS) -> AFIBuffers:
     """
     Calculate raw AFI score using weighted sum of signals
     
     Args:
-        df: DataFrame with friction signals (UIS, RIS, BSS, TSD)
+        buffers: AFI working arrays with the signal matrix
         weights: Dictionary of component weights
         
     Returns:
-        DataFrame with AFI_raw column added
+        Buffers with afi_raw set
     """
-    df = df.copy()
-    
     # Verify weights sum to 1.0
-    weight_sum = sum(weights.values())
-    if not np.isclose(weight_sum, 1.0):
-        raise ValueError(f"Weights must sum to 1.0, got {weight_sum}")
+    validate_weights(tuple(sorted(weights.items())))
     
-    # Calculate weighted sum
-    df['AFI_raw'] = (
-        weights['UIS'] * df['UIS'] +
-        weights['RIS'] * df['RIS'] +
-        weights['BSS'] * df['BSS'] +
-        weights['TSD'] * df['TSD']
-    )
+    # Calculate weighted sum as a single matrix-vector product
+    w_vec = np.array([weights[col] for col in SIGNAL_COLUMNS], dtype=np.float64)
+    buffers.afi_raw = buffers.signals @ w_vec
     
-    print(f"  Raw AFI range: {df['AFI_raw'].min():.2f} - {df['AFI_raw'].max():.2f}")
+    print(f"  Raw AFI range: {np.nanmin(buffers.afi_raw):.2f} - {np.nanmax(buffers.afi_raw):.2f}")
     
-    return df
+    return buffers
 
 
-def normalize_afi(df: pd.DataFrame) -> pd.DataFrame:
+def normalize_afi(buffers: AFIBuffers) -> AFIBuffers:
     """
     Normalize AFI to 0-100 scale
     
     Args:
-        df: DataFrame with AFI_raw column
+        buffers: AFI working arrays with afi_raw set
         
     Returns:
-        DataFrame with normalized AFI column
+        Buffers with afi set
     """
-    df = df.copy()
-    
     # Get min and max for normalization
-    afi_min = df['AFI_raw'].min()
-    afi_max = df['AFI_raw'].max()
+    afi_min = np.nanmin(buffers.afi_raw)
+    afi_max = np.nanmax(buffers.afi_raw)
     
     # Normalize: AFI = 100 * (AFI_raw - min) / (max - min)
-    df['AFI'] = 100 * (df['AFI_raw'] - afi_min) / (afi_max - afi_min)
+    buffers.afi = 100 * (buffers.afi_raw - afi_min) / (afi_max - afi_min)
     
-    print(f"  Normalized AFI range: {df['AFI'].min():.2f} - {df['AFI'].max():.2f}")
-    print(f"  Mean AFI: {df['AFI'].mean():.2f}, Median: {df['AFI'].median():.2f}")
+    afi = buffers.afi
+    print(f"  Normalized AFI range: {np.nanmin(afi):.2f} - {np.nanmax(afi):.2f}")
+    print(f"  Mean AFI: {np.nanmean(afi):.2f}, Median: {np.nanmedian(afi):.2f}")
     
-    return df
+    return buffers
+
+
+@njit(cache=True)
+def rank_afi(afi: np.ndarray):
+    """
+    Rank AFI scores in descending order in a single pass
+    
+    Args:
+        afi: Array of AFI scores
+        
+    Returns:
+        Tuple of (rank, percentile) arrays. Ties share the minimum rank and
+        percentiles use the average rank, matching pandas rank(method='min')
+        and rank(pct=True) respectively.
+    """
+    n = afi.shape[0]
+    order = np.argsort(-afi)
+    rank = np.empty(n, dtype=np.int64)
+    percentile = np.empty(n, dtype=np.float64)
+    
+    i = 0
+    while i < n:
+        # Find the run of tied scores starting at position i
+        j = i
+        while j + 1 < n and afi[order[j + 1]] == afi[order[i]]:
+            j += 1
+        
+        avg_rank = (i + j + 2) / 2.0
+        for k in range(i, j + 1):
+            rank[order[k]] = i + 1
+            percentile[order[k]] = 100.0 * avg_rank / n
+        i = j + 1
+    
+    return rank, percentile
 
 
-def add_rankings(df: pd.DataFrame) -> pd.DataFrame:
+@njit(cache=True)
+def rank_afi_within_groups(afi: np.ndarray, codes: np.ndarray, order: np.ndarray) -> np.ndarray:
+    """
+    Rank AFI scores in descending order within each group
+    
+    Args:
+        afi: Array of AFI scores
+        codes: Integer group code for each score
+        order: Permutation sorting rows by group, then by descending AFI
+        
+    Returns:
+        Array of ranks; ties share the minimum rank within their group
+    """
+    n = afi.shape[0]
+    rank = np.empty(n, dtype=np.int64)
+    group_start = 0
+    current_rank = 1
+    
+    for i in range(n):
+        idx = order[i]
+        if i == 0 or codes[idx] != codes[order[i - 1]]:
+            # New group: restart the rank counter
+            group_start = i
+            current_rank = 1
+        elif afi[idx] != afi[order[i - 1]]:
+            current_rank = i - group_start + 1
+        rank[idx] = current_rank
+    
+    return rank
+
+
+def add_rankings(buffers: AFIBuffers) -> AFIBuffers:
     """
     Add national and state-level rankings
     
     Args:
-        df: DataFrame with AFI scores
+        buffers: AFI working arrays with afi set
         
     Returns:
-        DataFrame with ranking columns added
+        Buffers with ranking arrays set
     """
-    df = df.copy()
+    afi = buffers.afi
     
-    # National ranking (higher AFI = worse, so rank descending)
-    df['national_rank'] = df['AFI'].rank(ascending=False, method='min').astype(int)
+    # National ranking and percentile scores (higher AFI = worse, so rank descending)
+    buffers.national_rank, buffers.national_percentile = rank_afi(afi)
     
     # State-level ranking
-    df['state_rank'] = df.groupby('state')['AFI'].rank(ascending=False, method='min').astype(int)
-    
-    # Percentile scores
-    df['national_percentile'] = calculate_percentile_rank(df, 'AFI', ascending=False)
+    order = np.lexsort((-afi, buffers.state_codes))
+    buffers.state_rank = rank_afi_within_groups(afi, buffers.state_codes, order)
     
     print(f"  Added rankings: National and State-level")
     
-    return df
+    return buffers
 
 
-def add_categories(df: pd.DataFrame) -> pd.DataFrame:
+def add_categories(buffers: AFIBuffers) -> AFIBuffers:
     """
     Categorize AFI scores into friction levels
     
     Args:
-        df: DataFrame with AFI scores
+        buffers: AFI working arrays with afi set
         
     Returns:
-        DataFrame with category column added
+        Buffers with category_codes set
     """
-    df = df.copy()
-    
-    # Define categories based on AFI score
-    def categorize_afi(score):
-        if score < 20:
-            return "Very Low Friction"
-        elif score < 40:
-            return "Low Friction"
-        elif score < 60:
-            return "Moderate Friction"
-        elif score < 80:
-            return "High Friction"
-        else:
-            return "Very High Friction"
-    
-    df['friction_category'] = df['AFI'].apply(categorize_afi)
-    
-    # Count by category
-    category_counts = df['friction_category'].value_counts()
+    # Bucket AFI scores: each bin edge is the inclusive lower bound of the next category
+    buffers.category_codes = np.searchsorted(CATEGORY_BINS, buffers.afi, side='right')
+    
+    # Count by category (most common first)
+    counts = np.bincount(buffers.category_codes, minlength=len(CATEGORY_LABELS))
+    total = len(buffers.category_codes)
     print(f"\n  Friction Distribution:")
-    for category, count in category_counts.items():
-        print(f"    {category}: {count} ({count/len(df)*100:.1f}%)")
+    for code in np.argsort(-counts, kind='stable'):
+        if counts[code] > 0:
+            print(f"    {CATEGORY_LABELS[code]}: {counts[code]} ({counts[code]/total*100:.1f}%)")
     
-    return df
+    return buffers
 
 
 def identify_top_friction_areas(df: pd.DataFrame, top_n: int = 10) -> pd.DataFrame:
@@ -176,7 +296,16 @@ def identify_top_friction_areas(df: pd.DataFrame, top_n: int = 10) -> pd.DataFra
     Returns:
         DataFrame with top friction areas
     """
-    top_areas = df.nlargest(top_n, 'AFI')[
+    # Select the top_n scores with an O(N) partition, then sort only those
+    neg_afi = -df['AFI'].to_numpy()
+    top_n = min(top_n, len(neg_afi))
+    if 0 < top_n < len(neg_afi):
+        idx = np.argpartition(neg_afi, top_n - 1)[:top_n]
+    else:
+        idx = np.arange(top_n)
+    idx = idx[np.argsort(neg_afi[idx], kind='stable')]
+    
+    top_areas = df.iloc[idx][
         ['state', 'district', 'period', 'AFI', 'UIS', 'RIS', 'BSS', 'TSD', 
          'national_rank', 'friction_category']
     ].copy()
@@ -184,12 +313,12 @@ def identify_top_friction_areas(df: pd.DataFrame, top_n: int = 10) -> pd.DataFra
     return top_areas
 
 
-def analyze_components(df: pd.DataFrame) -> Dict:
+def analyze_components(buffers: AFIBuffers) -> Dict:
     """
     Analyze which components contribute most to friction
     
     Args:
-        df: DataFrame with AFI scores and components
+        buffers: AFI working arrays with afi set
         
     Returns:
         Dictionary with component analysis
@@ -197,26 +326,27 @@ def analyze_components(df: pd.DataFrame) -> Dict:
     analysis = {}
     
     # Calculate correlation between components and AFI
-    components = ['UIS', 'RIS', 'BSS', 'TSD']
-    correlations = {}
+    components = SIGNAL_COLUMNS
+    signals = buffers.signals.astype(np.float64, copy=False)
     
-    for comp in components:
-        corr = df[comp].corr(df['AFI'])
-        correlations[comp] = corr
+    # One correlation matrix over [components..., AFI]; the last column holds
+    # each component's correlation with AFI
+    corr_matrix = np.corrcoef(np.column_stack([signals, buffers.afi]), rowvar=False)
+    correlations = dict(zip(components, corr_matrix[:-1, -1]))
     
     # Find dominant component (highest correlation)
     dominant_component = max(correlations, key=correlations.get)
     
-    # Calculate average contribution
-    avg_contributions = {}
-    for comp in components:
-        avg_contributions[comp] = (df[comp] * WEIGHTS[comp]).mean()
+    # Calculate average contribution (mean of each component times its weight)
+    w_vec = np.array([WEIGHTS[comp] for comp in components], dtype=np.float64)
+    component_means = signals.mean(axis=0)
+    avg_contributions = dict(zip(components, component_means * w_vec))
     
     analysis = {
         'correlations': correlations,
         'dominant_component': dominant_component,
         'average_contributions': avg_contributions,
-        'component_stats': df[components].describe().to_dict()
+        'component_stats': pd.DataFrame(buffers.signals, columns=components).describe().to_dict()
     }
     
     return analysis
@@ -245,25 +375,36 @@ def calculate_afi(signals_df: pd.DataFrame,
     print(f"Weights: UIS={weights['UIS']}, RIS={weights['RIS']}, "
           f"BSS={weights['BSS']}, TSD={weights['TSD']}")
     
+    # Work on a single downcast copy: float32 signals and categorical keys
+    # halve the bytes moved by each step
+    df = signals_df.astype({
+        **{col: np.float32 for col in SIGNAL_COLUMNS},
+        **{col: 'category' for col in ['state', 'district', 'period']}
+    })
+    
+    # The stages below share one set of working arrays; they are attached
+    # back onto the DataFrame once all scores are computed
+    buffers = AFIBuffers.from_frame(df)
+    
     # Calculate raw AFI
     print("\nStep 1: Calculating raw AFI...")
-    df = calculate_afi_raw(signals_df, weights)
+    buffers = calculate_afi_raw(buffers, weights)
     
     # Normalize AFI
     print("\nStep 2: Normalizing AFI to 0-100 scale...")
-    df = normalize_afi(df)
+    buffers = normalize_afi(buffers)
     
     # Add rankings
     print("\nStep 3: Adding rankings...")
-    df = add_rankings(df)
+    buffers = add_rankings(buffers)
     
     # Add categories
     print("\nStep 4: Categorizing friction levels...")
-    df = add_categories(df)
+    buffers = add_categories(buffers)
     
     # Analyze components
     print("\nStep 5: Analyzing components...")
-    component_analysis = analyze_components(df)
+    component_analysis = analyze_components(buffers)
     
     print(f"\n  Component Correlations with AFI:")
     for comp, corr in component_analysis['correlations'].items():
@@ -271,22 +412,25 @@ def calculate_afi(signals_df: pd.DataFrame,
     
     print(f"\n  Dominant Component: {component_analysis['dominant_component']}")
     
-    # Sort by AFI (highest first)
-    df = df.sort_values('AFI', ascending=False)
+    # Sort order by AFI (highest first), computed once and applied to each
+    # projected output so the narrow tables only gather the columns they keep
+    perm = np.argsort(-buffers.afi, kind='stable')
+    df = buffers.to_frame(df)
     
     # Save outputs
     print_section_header("SAVING OUTPUTS")
     
-    # Full index with all columns
-    save_csv(df, f"{output_dir}aadhaar_friction_index.csv")
-    
     # Index with rankings
     ranked_df = df[['state', 'district', 'period', 'AFI', 'national_rank', 
-                    'state_rank', 'national_percentile', 'friction_category']].copy()
-    save_csv(ranked_df, f"{output_dir}aadhaar_friction_index_ranked.csv")
+                    'state_rank', 'national_percentile', 'friction_category']].iloc[perm]
     
     # Index scores only
-    index_only = df[['state', 'district', 'period', 'AFI']].copy()
+    index_only = df[['state', 'district', 'period', 'AFI']].iloc[perm]
+    
+    # Full index with all columns
+    df = df.iloc[perm]
+    save_csv(df, f"{output_dir}aadhaar_friction_index.csv")
+    save_csv(ranked_df, f"{output_dir}aadhaar_friction_index_ranked.csv")
     save_csv(index_only, f"{output_dir}aadhaar_friction_index_only.csv")
     
     # Display top friction areas
@@ -322,20 +466,31 @@ def generate_summary_report(afi_df: pd.DataFrame) -> str:
     report.append(f"Districts Covered: {afi_df['district'].nunique()}")
     report.append(f"Time Periods: {afi_df['period'].nunique()}")
     
+    afi = afi_df['AFI'].to_numpy(dtype=np.float64)
+    afi_min, afi_median, afi_max = np.nanpercentile(afi, [0, 50, 100])
+    
     report.append(f"\n{'AFI Statistics':-^60}")
-    report.append(f"Minimum: {afi_df['AFI'].min():.2f}")
-    report.append(f"Maximum: {afi_df['AFI'].max():.2f}")
-    report.append(f"Mean: {afi_df['AFI'].mean():.2f}")
-    report.append(f"Median: {afi_df['AFI'].median():.2f}")
-    report.append(f"Std Dev: {afi_df['AFI'].std():.2f}")
+    report.append(f"Minimum: {afi_min:.2f}")
+    report.append(f"Maximum: {afi_max:.2f}")
+    report.append(f"Mean: {np.nanmean(afi):.2f}")
+    report.append(f"Median: {afi_median:.2f}")
+    report.append(f"Std Dev: {np.nanstd(afi, ddof=1):.2f}")
     
+    # Per-state mean AFI from bincount sums over factorized state codes
     report.append(f"\n{'Top 5 States by Avg AFI':-^60}")
-    top_states = afi_df.groupby('state')['AFI'].mean().sort_values(ascending=False).head()
-    for state, afi in top_states.items():
-        report.append(f"{state}: {afi:.2f}")
+    codes, states = pd.factorize(afi_df['state'])
+    valid = (codes >= 0) & ~np.isnan(afi)
+    state_means = (np.bincount(codes[valid], weights=afi[valid], minlength=len(states))
+                   / np.bincount(codes[valid], minlength=len(states)))
+    top_n = min(5, len(states))
+    top_codes = np.argpartition(-state_means, top_n - 1)[:top_n] if top_n else np.arange(0)
+    top_codes = top_codes[np.argsort(-state_means[top_codes], kind='stable')]
+    for code in top_codes:
+        report.append(f"{states[code]}: {state_means[code]:.2f}")
     
     report.append(f"\n{'Friction Category Distribution':-^60}")
     category_dist = afi_df['friction_category'].value_counts()
+    category_dist = category_dist[category_dist > 0]
     for category, count in category_dist.items():
         pct = count / len(afi_df) * 100
         report.append(f"{category}: {count} ({pct:.1f}%)")
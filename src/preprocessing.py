@@ -3,15 +3,49 @@ Data preprocessing pipeline for Aadhaar datasets
 Handles cleaning and preparation of biometric, demographic, and enrolment data
 """
 
+import contextlib
+import io
 import pandas as pd
 import numpy as np
-from typing import Tuple, List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Tuple, List
 from utils import (
     load_csv, save_csv, check_missing_values, 
     validate_dataframe, print_section_header
 )
 
 
+# Dtypes applied to the key columns while reading the raw CSVs
+KEY_DTYPES = {
+    'state': 'category',
+    'district': 'category',
+    'period': 'string'
+}
+
+
+def clean_name_column(series: pd.Series) -> pd.Series:
+    """
+    Strip and title-case a state/district name column
+    
+    Args:
+        series: Column of names (object or category dtype)
+        
+    Returns:
+        Cleaned names as a category column
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Clean the distinct categories only, then map rows onto them
+        categories = series.cat.categories
+        cleaned = categories.str.strip().str.title()
+        mapped = series.map(dict(zip(categories, cleaned)))
+        # Rebuild with sorted categories, as astype('category') on strings
+        # would; a one-to-one map keeps the pre-cleaning category order
+        return pd.Series(pd.Categorical(mapped, categories=cleaned.unique().sort_values()),
+                         index=series.index, name=series.name)
+    
+    return series.str.strip().str.title().astype('category')
+
+
 def clean_common_columns(df: pd.DataFrame) -> pd.DataFrame:
     """
     Clean common columns present in all datasets
@@ -28,19 +62,34 @@ def clean_common_columns(df: pd.DataFrame) -> pd.DataFrame:
     df.columns = df.columns.str.lower().str.strip().str.replace(' ', '_')
     
     # Clean state and district names
+    # (stored as category: the same names repeat across every period)
     if 'state' in df.columns:
-        df['state'] = df['state'].str.strip().str.title()
+        df['state'] = clean_name_column(df['state'])
     
     if 'district' in df.columns:
-        df['district'] = df['district'].str.strip().str.title()
+        df['district'] = clean_name_column(df['district'])
     
     # Standardize period format (YYYY-MM)
     if 'period' in df.columns:
-        df['period'] = pd.to_datetime(df['period']).dt.strftime('%Y-%m')
-    
-    # Remove duplicates
+        period = df['period'].astype(str).str.strip()
+        if period.str.match(r'\d{4}-\d{2}(?:$|[-T ])').all():
+            # Already ISO-like (YYYY-MM...): slicing avoids parsing and strftime
+            df['period'] = period.str.slice(0, 7)
+        else:
+            df['period'] = pd.to_datetime(df['period']).dt.strftime('%Y-%m')
+    
+    # Remove duplicates. Full-row duplicates must share the key columns, so hash
+    # the narrow keys first and only compare whole rows among key collisions.
     initial_rows = len(df)
-    df = df.drop_duplicates()
+    key_cols = [col for col in ['state', 'district', 'period'] if col in df.columns]
+    if key_cols:
+        key_collisions = df.duplicated(subset=key_cols, keep=False).to_numpy()
+        if key_collisions.any():
+            duplicate_mask = np.zeros(len(df), dtype=bool)
+            duplicate_mask[key_collisions] = df[key_collisions].duplicated().to_numpy()
+            df = df[~duplicate_mask]
+    else:
+        df = df.drop_duplicates()
     duplicates_removed = initial_rows - len(df)
     
     if duplicates_removed > 0:
@@ -49,6 +98,81 @@ def clean_common_columns(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+def fill_missing_values(df: pd.DataFrame, numeric_cols: List[str]) -> pd.DataFrame:
+    """
+    Fill missing numeric values with the state/district median,
+    falling back to the overall column median
+    
+    Args:
+        df: Cleaned DataFrame
+        numeric_cols: Numeric columns to fill
+        
+    Returns:
+        DataFrame with missing values filled
+    """
+    if not df[numeric_cols].isnull().any().any():
+        return df
+    
+    # Fill missing with median for that state/district (single grouped pass)
+    group_medians = df.groupby(['state', 'district'], observed=True)[numeric_cols].transform('median')
+    df[numeric_cols] = df[numeric_cols].fillna(group_medians)
+    
+    # If still missing, fill with overall median
+    df[numeric_cols] = df[numeric_cols].fillna(df[numeric_cols].median())
+    
+    return df
+
+
+def clip_outliers(df: pd.DataFrame, numeric_cols: List[str],
+                  quantile: float = 0.99) -> pd.DataFrame:
+    """
+    Clip negative values to zero and cap values above the given quantile
+    
+    Args:
+        df: Cleaned DataFrame
+        numeric_cols: Numeric columns to clip
+        quantile: Upper quantile used as the cap for each column
+        
+    Returns:
+        DataFrame with clipped numeric columns
+    """
+    if not numeric_cols:
+        return df
+    
+    arr = df[numeric_cols].to_numpy(dtype=np.float64, copy=True)
+    
+    # Remove negative values (data quality issue)
+    negative_counts = (arr < 0).sum(axis=0)
+    np.clip(arr, 0, None, out=arr)
+    
+    # Cap outliers at the per-column quantile. The two order statistics around
+    # the quantile position are found with np.partition (O(n) selection) and
+    # linearly interpolated, matching the default quantile method without a sort.
+    thresholds = np.full(arr.shape[1], np.nan)
+    for j in range(arr.shape[1]):
+        values = arr[:, j]
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            continue
+        pos = quantile * (len(values) - 1)
+        lo = int(np.floor(pos))
+        hi = min(lo + 1, len(values) - 1)
+        part = np.partition(values, [lo, hi])
+        thresholds[j] = part[lo] + (part[hi] - part[lo]) * (pos - lo)
+    outlier_counts = (arr > thresholds).sum(axis=0)
+    np.minimum(arr, thresholds, out=arr)
+    
+    for col, count in zip(numeric_cols, negative_counts):
+        if count > 0:
+            print(f"  ⚠ Removing {count} negative values in {col}")
+    for col, count in zip(numeric_cols, outlier_counts):
+        if count > 0:
+            print(f"  ⚠ Capping {count} outliers in {col}")
+    
+    df[numeric_cols] = arr
+    return df
+
+
 def preprocess_biometric(filepath: str, output_path: str = None) -> pd.DataFrame:
     """
     Preprocess biometric updates data
@@ -63,7 +187,7 @@ def preprocess_biometric(filepath: str, output_path: str = None) -> pd.DataFrame
     print_section_header("PREPROCESSING BIOMETRIC DATA")
     
     # Load data
-    df = load_csv(filepath)
+    df = load_csv(filepath, dtype=KEY_DTYPES)
     
     # Check missing values
     check_missing_values(df, "Raw Biometric Data")
@@ -75,28 +199,10 @@ def preprocess_biometric(filepath: str, output_path: str = None) -> pd.DataFrame
     numeric_cols = [col for col in df.columns if col not in ['state', 'district', 'period']]
     
     # Handle missing values in numeric columns
-    for col in numeric_cols:
-        if df[col].isnull().sum() > 0:
-            # Fill missing with median for that state/district
-            df[col] = df.groupby(['state', 'district'])[col].transform(
-                lambda x: x.fillna(x.median())
-            )
-            # If still missing, fill with overall median
-            df[col].fillna(df[col].median(), inplace=True)
+    df = fill_missing_values(df, numeric_cols)
     
-    # Remove negative values (data quality issue)
-    for col in numeric_cols:
-        if (df[col] < 0).any():
-            print(f"  ⚠ Removing {(df[col] < 0).sum()} negative values in {col}")
-            df[col] = df[col].clip(lower=0)
-    
-    # Remove outliers (values > 99th percentile)
-    for col in numeric_cols:
-        threshold = df[col].quantile(0.99)
-        outliers = df[col] > threshold
-        if outliers.sum() > 0:
-            print(f"  ⚠ Capping {outliers.sum()} outliers in {col}")
-            df.loc[outliers, col] = threshold
+    # Remove negative values and cap outliers (values > 99th percentile)
+    df = clip_outliers(df, numeric_cols)
     
     print(f"\n✓ Biometric preprocessing complete: {len(df)} rows, {len(df.columns)} columns")
     
@@ -121,7 +227,7 @@ def preprocess_demographic(filepath: str, output_path: str = None) -> pd.DataFra
     print_section_header("PREPROCESSING DEMOGRAPHIC DATA")
     
     # Load data
-    df = load_csv(filepath)
+    df = load_csv(filepath, dtype=KEY_DTYPES)
     
     # Check missing values
     check_missing_values(df, "Raw Demographic Data")
@@ -132,28 +238,11 @@ def preprocess_demographic(filepath: str, output_path: str = None) -> pd.DataFra
     # Expected columns for demographic data
     numeric_cols = [col for col in df.columns if col not in ['state', 'district', 'period']]
     
-    # Handle missing values
-    for col in numeric_cols:
-        if df[col].isnull().sum() > 0:
-            # Fill with state/district median
-            df[col] = df.groupby(['state', 'district'])[col].transform(
-                lambda x: x.fillna(x.median())
-            )
-            df[col].fillna(df[col].median(), inplace=True)
-    
-    # Data validation
-    for col in numeric_cols:
-        # Remove negative values
-        if (df[col] < 0).any():
-            print(f"  ⚠ Removing {(df[col] < 0).sum()} negative values in {col}")
-            df[col] = df[col].clip(lower=0)
-        
-        # Cap extreme outliers
-        threshold = df[col].quantile(0.99)
-        outliers = df[col] > threshold
-        if outliers.sum() > 0:
-            print(f"  ⚠ Capping {outliers.sum()} outliers in {col}")
-            df.loc[outliers, col] = threshold
+    # Handle missing values in numeric columns
+    df = fill_missing_values(df, numeric_cols)
+    
+    # Remove negative values and cap outliers (values > 99th percentile)
+    df = clip_outliers(df, numeric_cols)
     
     print(f"\n✓ Demographic preprocessing complete: {len(df)} rows, {len(df.columns)} columns")
     
@@ -178,7 +267,7 @@ def preprocess_enrolment(filepath: str, output_path: str = None) -> pd.DataFrame
     print_section_header("PREPROCESSING ENROLMENT DATA")
     
     # Load data
-    df = load_csv(filepath)
+    df = load_csv(filepath, dtype=KEY_DTYPES)
     
     # Check missing values
     check_missing_values(df, "Raw Enrolment Data")
@@ -189,27 +278,11 @@ def preprocess_enrolment(filepath: str, output_path: str = None) -> pd.DataFrame
     # Expected columns for enrolment data
     numeric_cols = [col for col in df.columns if col not in ['state', 'district', 'period']]
     
-    # Handle missing values
-    for col in numeric_cols:
-        if df[col].isnull().sum() > 0:
-            df[col] = df.groupby(['state', 'district'])[col].transform(
-                lambda x: x.fillna(x.median())
-            )
-            df[col].fillna(df[col].median(), inplace=True)
-    
-    # Data validation
-    for col in numeric_cols:
-        # Remove negative values
-        if (df[col] < 0).any():
-            print(f"  ⚠ Removing {(df[col] < 0).sum()} negative values in {col}")
-            df[col] = df[col].clip(lower=0)
-        
-        # Cap outliers
-        threshold = df[col].quantile(0.99)
-        outliers = df[col] > threshold
-        if outliers.sum() > 0:
-            print(f"  ⚠ Capping {outliers.sum()} outliers in {col}")
-            df.loc[outliers, col] = threshold
+    # Handle missing values in numeric columns
+    df = fill_missing_values(df, numeric_cols)
+    
+    # Remove negative values and cap outliers (values > 99th percentile)
+    df = clip_outliers(df, numeric_cols)
     
     print(f"\n✓ Enrolment preprocessing complete: {len(df)} rows, {len(df.columns)} columns")
     
@@ -244,25 +317,29 @@ def merge_datasets(biometric_df: pd.DataFrame,
                         ('Enrolment', enrolment_df)]:
         validate_dataframe(df, merge_keys, df_name)
     
-    # Merge biometric and demographic
-    merged = pd.merge(
-        biometric_df, 
-        demographic_df, 
-        on=merge_keys, 
-        how='outer',
-        suffixes=('_bio', '_demo')
-    )
-    
-    print(f"  Merged Biometric + Demographic: {len(merged)} rows")
-    
-    # Merge with enrolment
-    merged = pd.merge(
-        merged, 
-        enrolment_df, 
-        on=merge_keys, 
-        how='outer',
-        suffixes=('', '_enrol')
-    )
+    # Resolve column name collisions up front, mirroring the suffixes an
+    # outer merge would add: '_bio'/'_demo' between biometric and demographic,
+    # then '_enrol' for enrolment columns that clash with either
+    bio_cols = [col for col in biometric_df.columns if col not in merge_keys]
+    demo_cols = [col for col in demographic_df.columns if col not in merge_keys]
+    shared = set(bio_cols) & set(demo_cols)
+    bio = biometric_df.rename(columns={col: f"{col}_bio" for col in shared})
+    demo = demographic_df.rename(columns={col: f"{col}_demo" for col in shared})
+    taken = set(bio.columns) | set(demo.columns)
+    enrol = enrolment_df.rename(columns={
+        col: f"{col}_enrol" for col in enrolment_df.columns
+        if col not in merge_keys and col in taken
+    })
+    
+    frames = [frame.set_index(merge_keys) for frame in (bio, demo, enrol)]
+    
+    if all(frame.index.is_unique for frame in frames):
+        # Align all three datasets on the shared key index in one pass
+        merged = pd.concat(frames, axis=1, join='outer').sort_index().reset_index()
+    else:
+        # Repeated keys need merge's many-to-many join semantics
+        merged = pd.merge(bio, demo, on=merge_keys, how='outer')
+        merged = pd.merge(merged, enrol, on=merge_keys, how='outer')
     
     print(f"  Final merged dataset: {len(merged)} rows")
     
@@ -272,10 +349,28 @@ def merge_datasets(biometric_df: pd.DataFrame,
     return merged
 
 
+def run_with_captured_output(func: Callable, *args) -> Tuple[pd.DataFrame, str]:
+    """
+    Run a preprocessing function, capturing everything it prints
+    
+    Args:
+        func: Preprocessing function to call
+        *args: Positional arguments for func
+        
+    Returns:
+        Tuple of (function result, captured output)
+    """
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        result = func(*args)
+    return result, buffer.getvalue()
+
+
 def preprocess_all(biometric_path: str,
                    demographic_path: str,
                    enrolment_path: str,
-                   output_dir: str = 'datasets/processed/') -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+                   output_dir: str = 'datasets/processed/',
+                   parallel: bool = True) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """
     Run complete preprocessing pipeline for all datasets
     
@@ -284,27 +379,33 @@ def preprocess_all(biometric_path: str,
         demographic_path: Path to raw demographic CSV
         enrolment_path: Path to raw enrolment CSV
         output_dir: Directory to save cleaned files
+        parallel: Preprocess the three datasets in parallel worker processes
         
     Returns:
         Tuple of (biometric_df, demographic_df, enrolment_df)
     """
     print_section_header("AADHAAR DATA PREPROCESSING PIPELINE")
     
-    # Preprocess each dataset
-    biometric_clean = preprocess_biometric(
-        biometric_path, 
-        f"{output_dir}biometric_updates_cleaned.csv"
-    )
-    
-    demographic_clean = preprocess_demographic(
-        demographic_path,
-        f"{output_dir}demographic_updates_cleaned.csv"
-    )
-    
-    enrolment_clean = preprocess_enrolment(
-        enrolment_path,
-        f"{output_dir}enrolment_cleaned.csv"
-    )
+    jobs = [
+        (preprocess_biometric, biometric_path, f"{output_dir}biometric_updates_cleaned.csv"),
+        (preprocess_demographic, demographic_path, f"{output_dir}demographic_updates_cleaned.csv"),
+        (preprocess_enrolment, enrolment_path, f"{output_dir}enrolment_cleaned.csv")
+    ]
+    
+    # Preprocess each dataset; the three are independent, so run them in
+    # separate processes and replay each one's log in order once it finishes
+    if parallel:
+        with ProcessPoolExecutor(max_workers=len(jobs)) as executor:
+            futures = [executor.submit(run_with_captured_output, *job) for job in jobs]
+            results = []
+            for future in futures:
+                cleaned, output = future.result()
+                print(output, end='')
+                results.append(cleaned)
+    else:
+        results = [func(path, output_path) for func, path, output_path in jobs]
+    
+    biometric_clean, demographic_clean, enrolment_clean = results
     
     print_section_header("PREPROCESSING COMPLETE")
     print("✓ All datasets cleaned and saved")
@@ -5,15 +5,67 @@ Computes UIS, RIS, BSS, and TSD components for Aadhaar Friction Index
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List
+from typing import Dict, List, Optional
 from utils import (
     normalize_column, print_section_header, 
-    validate_dataframe, save_csv
+    validate_dataframe, save_csv, downcast_counts, row_contiguous, njit, prange
 )
 
 
+MERGE_KEYS = ['state', 'district', 'period']
+
+
+def join_update_datasets(biometric_df: pd.DataFrame,
+                         demographic_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Outer-join biometric and demographic updates on state, district, period
+    
+    Both frames are indexed on the merge keys and sorted once, so the join
+    aligns sorted indexes instead of re-hashing the keys.
+    
+    Args:
+        biometric_df: Cleaned biometric updates data
+        demographic_df: Cleaned demographic updates data
+        
+    Returns:
+        Joined DataFrame; clashing columns get '_bio'/'_demo' suffixes
+    """
+    bio = biometric_df.set_index(MERGE_KEYS).sort_index()
+    demo = demographic_df.set_index(MERGE_KEYS).sort_index()
+    joined = bio.join(demo, how='outer', lsuffix='_bio', rsuffix='_demo')
+    return joined.reset_index()
+
+
+def unify_key_categories(*frames: pd.DataFrame) -> List[pd.DataFrame]:
+    """
+    Encode state and district as categoricals sharing one set of categories
+    
+    Merges and groupbys then compare integer codes instead of rehashing the
+    name strings, and joins keep the categorical dtype.
+    
+    Args:
+        *frames: DataFrames with state and district columns
+        
+    Returns:
+        List of DataFrames with re-encoded key columns, in input order
+    """
+    frames = list(frames)
+    for col in ('state', 'district'):
+        categories = pd.api.types.union_categoricals(
+            [frame[col].astype('category') for frame in frames],
+            sort_categories=True
+        ).categories
+        # set_categories recodes even when a frame already holds the same
+        # category set in another order (astype would keep that order)
+        frames = [frame.assign(**{col: frame[col].astype('category').cat.set_categories(categories)})
+                  for frame in frames]
+    
+    return frames
+
+
 def calculate_uis(biometric_df: pd.DataFrame, 
-                  demographic_df: pd.DataFrame) -> pd.DataFrame:
+                  demographic_df: pd.DataFrame,
+                  combined_df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
     """
     Calculate Update Intensity Score (UIS)
     Measures how frequently users need to update their Aadhaar information
@@ -21,6 +73,7 @@ def calculate_uis(biometric_df: pd.DataFrame,
     Args:
         biometric_df: Cleaned biometric updates data
         demographic_df: Cleaned demographic updates data
+        combined_df: Optional precomputed join_update_datasets() result
         
     Returns:
         DataFrame with UIS scores by state, district, period
@@ -28,32 +81,34 @@ def calculate_uis(biometric_df: pd.DataFrame,
     print("\nCalculating Update Intensity Score (UIS)...")
     
     # Merge datasets
-    merge_keys = ['state', 'district', 'period']
-    df = pd.merge(biometric_df, demographic_df, on=merge_keys, how='outer', suffixes=('_bio', '_demo'))
-    
-    # Identify update columns (exclude merge keys)
-    bio_update_cols = [col for col in biometric_df.columns if col not in merge_keys]
-    demo_update_cols = [col for col in demographic_df.columns if col not in merge_keys]
+    merge_keys = MERGE_KEYS
+    if combined_df is None:
+        combined_df = join_update_datasets(biometric_df, demographic_df)
+    df = downcast_counts(combined_df, merge_keys)
+    
+    # Identify update columns (exclude merge keys), partitioning the joined
+    # columns once with vectorized Index operations
+    bio_update_cols = biometric_df.columns.difference(merge_keys)
+    demo_update_cols = demographic_df.columns.difference(merge_keys)
+    cols = df.columns
+    bio_sel = cols[cols.str.endswith('_bio') | cols.isin(bio_update_cols)].tolist()
+    demo_sel = cols[cols.str.endswith('_demo') | cols.isin(demo_update_cols)].tolist()
     
     # Calculate total update frequency
-    # Sum all biometric updates
-    df['bio_updates'] = df[[col for col in df.columns if col.endswith('_bio') or col in bio_update_cols]].sum(axis=1)
-    
-    # Sum all demographic updates
-    df['demo_updates'] = df[[col for col in df.columns if col.endswith('_demo') or col in demo_update_cols]].sum(axis=1)
+    # Sum all biometric / demographic updates; NaNs from the outer join count as 0
+    bio_arr = row_contiguous(df, bio_sel)
+    demo_arr = row_contiguous(df, demo_sel)
     
     # Total updates (weighted: biometric updates are more friction-prone)
-    df['total_updates'] = (df['bio_updates'] * 1.5) + df['demo_updates']
+    total_updates = np.nansum(bio_arr, axis=1) * 1.5 + np.nansum(demo_arr, axis=1)
     
     # Calculate update rate per 1000 people (if population data available)
     # Otherwise use raw counts
-    df['UIS'] = df['total_updates']
-    
     # Normalize to 0-100 scale
-    df['UIS'] = normalize_column(df['UIS'], 0, 100)
+    uis = normalize_column(pd.Series(total_updates, index=df.index), 0, 100)
     
     # Select relevant columns
-    result = df[merge_keys + ['UIS']].copy()
+    result = df[merge_keys].assign(UIS=uis)
     
     print(f"  ✓ UIS calculated for {len(result)} records")
     print(f"    Range: {result['UIS'].min():.2f} - {result['UIS'].max():.2f}")
@@ -63,7 +118,8 @@ def calculate_uis(biometric_df: pd.DataFrame,
 
 
 def calculate_ris(biometric_df: pd.DataFrame, 
-                  demographic_df: pd.DataFrame) -> pd.DataFrame:
+                  demographic_df: pd.DataFrame,
+                  combined_df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
     """
     Calculate Repeat Interaction Score (RIS)
     Tracks repeated authentication attempts indicating system friction
@@ -71,36 +127,36 @@ def calculate_ris(biometric_df: pd.DataFrame,
     Args:
         biometric_df: Cleaned biometric updates data
         demographic_df: Cleaned demographic updates data
+        combined_df: Optional precomputed join_update_datasets() result
         
     Returns:
         DataFrame with RIS scores by state, district, period
     """
     print("\nCalculating Repeat Interaction Score (RIS)...")
     
-    merge_keys = ['state', 'district', 'period']
-    df = pd.merge(biometric_df, demographic_df, on=merge_keys, how='outer')
+    merge_keys = MERGE_KEYS
+    if combined_df is None:
+        combined_df = join_update_datasets(biometric_df, demographic_df)
+    df = downcast_counts(combined_df, merge_keys)
     
     # Calculate repeat interaction metrics
     # Assumption: Failed attempts require repeat interactions
     
     # Identify columns that indicate failures or retries
-    failure_cols = [col for col in df.columns if any(keyword in col.lower() 
-                   for keyword in ['fail', 'retry', 'reject', 'error', 'repeat'])]
+    failure_cols = df.columns[
+        df.columns.str.lower().str.contains('fail|retry|reject|error|repeat', regex=True)
+    ].tolist()
     
     if failure_cols:
-        df['repeat_interactions'] = df[failure_cols].sum(axis=1)
+        repeat_interactions = df[failure_cols].sum(axis=1)
     else:
         # If no explicit failure columns, use update frequency as proxy
         update_cols = [col for col in df.columns if col not in merge_keys]
-        df['repeat_interactions'] = df[update_cols].std(axis=1)
+        repeat_interactions = df[update_cols].std(axis=1)
     
-    # Calculate RIS
-    df['RIS'] = df['repeat_interactions']
-    
-    # Normalize to 0-100 scale
-    df['RIS'] = normalize_column(df['RIS'], 0, 100)
-    
-    result = df[merge_keys + ['RIS']].copy()
+    # Calculate RIS, normalized to 0-100 scale
+    # (assign builds a new frame: df may be the shared combined frame)
+    result = df[merge_keys].assign(RIS=normalize_column(repeat_interactions, 0, 100))
     
     print(f"  ✓ RIS calculated for {len(result)} records")
     print(f"    Range: {result['RIS'].min():.2f} - {result['RIS'].max():.2f}")
@@ -109,6 +165,107 @@ def calculate_ris(biometric_df: pd.DataFrame,
     return result
 
 
+def group_codes(*keys: pd.Series) -> np.ndarray:
+    """
+    Factorize one or more key columns into dense integer group codes
+    
+    Args:
+        *keys: Key columns of equal length
+        
+    Returns:
+        int64 array of group codes; -1 where any key is missing
+    """
+    combined = np.zeros(len(keys[0]), dtype=np.int64)
+    missing = np.zeros(len(keys[0]), dtype=bool)
+    for key in keys:
+        key_codes, uniques = pd.factorize(key)
+        missing |= key_codes < 0
+        combined = combined * (len(uniques) + 1) + key_codes
+    
+    codes, _ = pd.factorize(combined)
+    codes[missing] = -1
+    return codes.astype(np.int64, copy=False)
+
+
+def group_mean_std(values: np.ndarray, codes: np.ndarray):
+    """
+    Broadcast per-group mean and sample std back onto each row
+    
+    Args:
+        values: float64 values (NaNs are skipped)
+        codes: Group code per row, -1 for rows without a group
+        
+    Returns:
+        Tuple of (mean, std) arrays aligned with values; NaN for rows without
+        a group, and std is NaN for groups with fewer than two values
+    """
+    valid = (codes >= 0) & ~np.isnan(values)
+    n_groups = codes.max() + 1 if len(codes) else 0
+    counts = np.bincount(codes[valid], minlength=n_groups)
+    sums = np.bincount(codes[valid], weights=values[valid], minlength=n_groups)
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts
+        # Two-pass variance: sum squared deviations from the group mean
+        deviations = values[valid] - means[codes[valid]]
+        sq_dev = np.bincount(codes[valid], weights=deviations * deviations, minlength=n_groups)
+        stds = np.where(counts > 1, np.sqrt(sq_dev / (counts - 1)), np.nan)
+    
+    has_group = codes >= 0
+    row_mean = np.full(len(codes), np.nan)
+    row_std = np.full(len(codes), np.nan)
+    row_mean[has_group] = means[codes[has_group]]
+    row_std[has_group] = stds[codes[has_group]]
+    return row_mean, row_std
+
+
+@njit(parallel=True, cache=True)
+def bss_rowwise(arr: np.ndarray) -> np.ndarray:
+    """
+    Combine per-row sum, variance and max into raw BSS scores
+    
+    NaNs are skipped like pandas' row reductions: an all-NaN row sums to 0,
+    and variance needs at least two observed values.
+    
+    Args:
+        arr: 2D float array, one row per record
+        
+    Returns:
+        Array of 0.4 * sum + 0.3 * variance + 0.3 * max per row
+    """
+    n_rows, n_cols = arr.shape
+    out = np.empty(n_rows, dtype=np.float64)
+    
+    for i in prange(n_rows):
+        total = 0.0
+        peak = -np.inf
+        count = 0
+        for j in range(n_cols):
+            value = arr[i, j]
+            if not np.isnan(value):
+                total += value
+                if value > peak:
+                    peak = value
+                count += 1
+        
+        if count < 2:
+            variance = np.nan
+        else:
+            mean = total / count
+            sq_dev = 0.0
+            for j in range(n_cols):
+                value = arr[i, j]
+                if not np.isnan(value):
+                    sq_dev += (value - mean) ** 2
+            variance = sq_dev / (count - 1)
+        
+        if count == 0:
+            peak = np.nan
+        out[i] = total * 0.4 + variance * 0.3 + peak * 0.3
+    
+    return out
+
+
 def calculate_bss(biometric_df: pd.DataFrame) -> pd.DataFrame:
     """
     Calculate Biometric Stress Score (BSS)
@@ -122,35 +279,25 @@ def calculate_bss(biometric_df: pd.DataFrame) -> pd.DataFrame:
     """
     print("\nCalculating Biometric Stress Score (BSS)...")
     
-    merge_keys = ['state', 'district', 'period']
-    df = biometric_df.copy()
+    merge_keys = MERGE_KEYS
     
     # Identify biometric-related columns
-    bio_cols = [col for col in df.columns if col not in merge_keys]
+    bio_cols = [col for col in biometric_df.columns if col not in merge_keys]
     
     # Calculate biometric stress indicators
     # Higher values indicate more stress/friction
     
-    # 1. Total biometric transactions
-    df['total_bio_transactions'] = df[bio_cols].sum(axis=1)
+    # One contiguous row-major block shared by all three row reductions
+    arr = row_contiguous(biometric_df, bio_cols)
     
+    # 1. Total biometric transactions
     # 2. Variance in biometric attempts (higher variance = more stress)
-    df['bio_variance'] = df[bio_cols].var(axis=1)
-    
     # 3. Maximum value (indicates peak stress)
-    df['bio_max'] = df[bio_cols].max(axis=1)
-    
     # Combine metrics with weights
-    df['BSS_raw'] = (
-        df['total_bio_transactions'] * 0.4 +
-        df['bio_variance'] * 0.3 +
-        df['bio_max'] * 0.3
-    )
+    bss_raw = pd.Series(bss_rowwise(arr), index=biometric_df.index)
     
     # Normalize to 0-100 scale
-    df['BSS'] = normalize_column(df['BSS_raw'], 0, 100)
-    
-    result = df[merge_keys + ['BSS']].copy()
+    result = biometric_df[merge_keys].assign(BSS=normalize_column(bss_raw, 0, 100))
     
     print(f"  ✓ BSS calculated for {len(result)} records")
     print(f"    Range: {result['BSS'].min():.2f} - {result['BSS'].max():.2f}")
@@ -176,31 +323,44 @@ def calculate_tsd(biometric_df: pd.DataFrame,
     """
     print("\nCalculating Temporal Deviation (TSD)...")
     
-    merge_keys = ['state', 'district', 'period']
-    
-    # Merge all datasets
-    df = biometric_df.copy()
-    df = pd.merge(df, demographic_df, on=merge_keys, how='outer', suffixes=('_bio', '_demo'))
-    df = pd.merge(df, enrolment_df, on=merge_keys, how='outer')
+    merge_keys = MERGE_KEYS
     
     # Calculate temporal metrics
-    # Group by state and district to calculate deviations over time
+    # Sum each dataset's activity on its own narrow frame, then align the
+    # per-record totals on the shared keys instead of joining all columns
+    totals = []
+    for frame in (biometric_df, demographic_df, enrolment_df):
+        value_cols = [col for col in frame.columns if col not in merge_keys]
+        totals.append(pd.Series(
+            np.nansum(row_contiguous(frame, value_cols), axis=1),
+            index=pd.MultiIndex.from_frame(frame[merge_keys])
+        ))
+    total_activity = totals[0].add(totals[1], fill_value=0).add(totals[2], fill_value=0)
     
-    all_value_cols = [col for col in df.columns if col not in merge_keys]
-    df['total_activity'] = df[all_value_cols].sum(axis=1)
+    # Group by state and district to calculate deviations over time
+    df = total_activity.rename('total_activity').reset_index()
     
     # Calculate rolling statistics within each state-district group
     df = df.sort_values(merge_keys)
     
+    # Integer state-district group codes (-1 where either key is missing,
+    # which groupby would drop); sorted rows keep each group contiguous
+    codes = group_codes(df['state'], df['district'])
+    activity = df['total_activity'].to_numpy(dtype=np.float64)
+    group_mean, group_std = group_mean_std(activity, codes)
+    df['group_mean'] = group_mean
+    df['group_std'] = group_std
+    
     # Calculate deviation from group mean
-    df['group_mean'] = df.groupby(['state', 'district'])['total_activity'].transform('mean')
-    df['deviation_from_mean'] = np.abs(df['total_activity'] - df['group_mean'])
+    df['deviation_from_mean'] = np.abs(activity - group_mean)
     
     # Calculate month-over-month change (volatility)
-    df['mom_change'] = df.groupby(['state', 'district'])['total_activity'].diff().abs()
+    mom_change = np.full(len(df), np.nan)
+    same_group = (codes[1:] == codes[:-1]) & (codes[1:] >= 0)
+    mom_change[1:] = np.where(same_group, np.abs(activity[1:] - activity[:-1]), np.nan)
+    df['mom_change'] = mom_change
     
     # Calculate coefficient of variation within group
-    df['group_std'] = df.groupby(['state', 'district'])['total_activity'].transform('std')
     df['coefficient_of_variation'] = df['group_std'] / (df['group_mean'] + 1)  # +1 to avoid division by zero
     
     # Combine temporal deviation metrics
@@ -213,7 +373,7 @@ def calculate_tsd(biometric_df: pd.DataFrame,
     # Normalize to 0-100 scale
     df['TSD'] = normalize_column(df['TSD_raw'], 0, 100)
     
-    result = df[merge_keys + ['TSD']].copy()
+    result = df[merge_keys + ['TSD']]
     
     print(f"  ✓ TSD calculated for {len(result)} records")
     print(f"    Range: {result['TSD'].min():.2f} - {result['TSD'].max():.2f}")
@@ -240,20 +400,35 @@ def calculate_all_signals(biometric_df: pd.DataFrame,
     """
     print_section_header("CALCULATING FRICTION SIGNALS")
     
-    merge_keys = ['state', 'district', 'period']
+    merge_keys = MERGE_KEYS
+    
+    # Share state/district categories across the inputs so keys join on codes,
+    # and downcast the counts to float32 once for all four calculators
+    biometric_df, demographic_df, enrolment_df = (
+        downcast_counts(frame, merge_keys)
+        for frame in unify_key_categories(biometric_df, demographic_df, enrolment_df)
+    )
+    
+    # Join biometric and demographic updates once; UIS and RIS share it
+    combined_df = join_update_datasets(biometric_df, demographic_df)
     
     # Calculate each signal
-    uis_df = calculate_uis(biometric_df, demographic_df)
-    ris_df = calculate_ris(biometric_df, demographic_df)
+    uis_df = calculate_uis(biometric_df, demographic_df, combined_df)
+    ris_df = calculate_ris(biometric_df, demographic_df, combined_df)
     bss_df = calculate_bss(biometric_df)
     tsd_df = calculate_tsd(biometric_df, demographic_df, enrolment_df)
     
     # Merge all signals
     print("\nMerging all signals...")
-    signals = uis_df.copy()
-    signals = pd.merge(signals, ris_df, on=merge_keys, how='outer')
-    signals = pd.merge(signals, bss_df, on=merge_keys, how='outer')
-    signals = pd.merge(signals, tsd_df, on=merge_keys, how='outer')
+    signal_frames = [frame.set_index(merge_keys) for frame in (uis_df, ris_df, bss_df, tsd_df)]
+    if all(frame.index.is_unique for frame in signal_frames):
+        # Align the four results on their shared key index in one pass
+        signals = pd.concat(signal_frames, axis=1, join='outer').sort_index().reset_index()
+    else:
+        # Repeated keys need merge's many-to-many join semantics
+        signals = uis_df
+        for frame in (ris_df, bss_df, tsd_df):
+            signals = pd.merge(signals, frame, on=merge_keys, how='outer', sort=False)
     
     # Fill any missing values with 0
     signals[['UIS', 'RIS', 'BSS', 'TSD']] = signals[['UIS', 'RIS', 'BSS', 'TSD']].fillna(0)
@@ -2,23 +2,103 @@
 Utility functions for Aadhaar Friction Index project
 """
 
+import os
+import warnings
 import pandas as pd
 import numpy as np
+from pathlib import Path
 from typing import List, Dict, Optional
+from scipy.stats import rankdata
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    # pyarrow is optional: fall back to the pandas readers/writers
+    pa = None
+    pa_csv = None
 
-def load_csv(filepath: str) -> pd.DataFrame:
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    # numba is optional: fall back to running the kernels as plain Python
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+def read_csv_arrow(filepath: str, dtype: Optional[Dict[str, object]] = None) -> pd.DataFrame:
+    """
+    Read a CSV with pyarrow's multi-threaded reader
+    
+    Columns requested as 'category' are dictionary-encoded while parsing, so
+    repeated names are never materialized as Python strings.
+    
+    Args:
+        filepath: Path to CSV file
+        dtype: Optional column dtypes keyed by the file's column names
+        
+    Returns:
+        DataFrame with NumPy-backed columns
+    """
+    dtype = dtype or {}
+    column_types = {}
+    for col, col_dtype in dtype.items():
+        if col_dtype == 'category':
+            column_types[col] = pa.dictionary(pa.int32(), pa.string())
+        elif col_dtype in ('string', str):
+            column_types[col] = pa.string()
+        else:
+            column_types[col] = pa.from_numpy_dtype(np.dtype(col_dtype))
+    
+    table = pa_csv.read_csv(
+        filepath,
+        convert_options=pa_csv.ConvertOptions(column_types=column_types, strings_can_be_null=True)
+    )
+    df = table.to_pandas()
+    
+    # Match pandas' astype('category'): categories sorted, not in file order
+    for col, col_dtype in dtype.items():
+        if col_dtype == 'category':
+            df[col] = df[col].cat.reorder_categories(df[col].cat.categories.sort_values())
+    
+    return df.astype({col: col_dtype for col, col_dtype in dtype.items() if col_dtype != 'category'})
+
+
+def load_csv(filepath: str, dtype: Optional[Dict[str, object]] = None) -> pd.DataFrame:
     """
     Load CSV file with error handling
     
+    Uses the multi-threaded pyarrow parser when pyarrow is installed.
+    
     Args:
         filepath: Path to CSV file
+        dtype: Optional column dtypes keyed by normalized column name
+               (lowercase, underscores instead of spaces); unknown names are ignored
         
     Returns:
         DataFrame with loaded data
     """
     try:
-        df = pd.read_csv(filepath)
+        col_dtypes = {}
+        if dtype:
+            # Match the requested dtypes against the file's own header names
+            header = pd.read_csv(filepath, nrows=0).columns
+            col_dtypes = {
+                col: dtype[col.lower().strip().replace(' ', '_')]
+                for col in header
+                if col.lower().strip().replace(' ', '_') in dtype
+            }
+        
+        if pa_csv is not None:
+            df = read_csv_arrow(filepath, col_dtypes)
+        else:
+            df = pd.read_csv(filepath, dtype=col_dtypes or None)
         print(f"✓ Loaded {filepath}: {len(df)} rows, {len(df.columns)} columns")
         return df
     except FileNotFoundError:
@@ -33,18 +113,53 @@ def save_csv(df: pd.DataFrame, filepath: str) -> None:
     """
     Save DataFrame to CSV with confirmation
     
+    CSVs are written with pandas so the format matches the committed files
+    (minimal quoting, integral floats as ``108.0``). Paths ending in .parquet
+    are written as zstd-compressed Parquet instead.
+    
     Args:
         df: DataFrame to save
         filepath: Output file path
     """
     try:
-        df.to_csv(filepath, index=False)
+        if str(filepath).endswith('.parquet'):
+            df.to_parquet(filepath, index=False, compression='zstd')
+        else:
+            df.to_csv(filepath, index=False)
         print(f"✓ Saved to {filepath}: {len(df)} rows")
     except Exception as e:
         print(f"✗ Error saving to {filepath}: {str(e)}")
         raise
 
 
+def convert_csv_to_parquet(directory: str, output_dir: Optional[str] = None) -> List[str]:
+    """
+    Write a zstd-compressed Parquet copy of every CSV in a directory
+    
+    One-off migration step for the dashboard tables. Each copy is written to
+    a temporary file and moved into place, so readers never see a partial file.
+    
+    Args:
+        directory: Directory holding the CSV files
+        output_dir: Directory for the Parquet copies (default: <directory>/parquet)
+        
+    Returns:
+        Paths of the Parquet files written
+    """
+    output_dir = Path(output_dir) if output_dir else Path(directory) / 'parquet'
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    written = []
+    for csv_file in sorted(Path(directory).glob('*.csv')):
+        parquet_file = output_dir / f"{csv_file.stem}.parquet"
+        tmp_file = output_dir / f"{csv_file.stem}.parquet.tmp"
+        pd.read_csv(csv_file).to_parquet(tmp_file, index=False, compression='zstd')
+        os.replace(tmp_file, parquet_file)
+        print(f"✓ Converted {csv_file} to {parquet_file}")
+        written.append(str(parquet_file))
+    return written
+
+
 def check_missing_values(df: pd.DataFrame, name: str = "Dataset") -> Dict:
     """
     Check for missing values in DataFrame
@@ -56,13 +171,21 @@ def check_missing_values(df: pd.DataFrame, name: str = "Dataset") -> Dict:
     Returns:
         Dictionary with missing value statistics
     """
-    missing = df.isnull().sum()
-    missing_pct = (missing / len(df)) * 100
+    # Count per column without materializing a full boolean mask frame
+    missing = np.fromiter(
+        (
+            np.count_nonzero(np.isnan(df[col].to_numpy()))
+            if df[col].dtype.kind == 'f' else df[col].isna().sum()
+            for col in df.columns
+        ),
+        dtype=np.int64, count=len(df.columns)
+    )
+    missing_pct = (missing / len(df)) * 100 if len(df) else np.zeros(len(missing))
     
     missing_df = pd.DataFrame({
-        'Column': missing.index,
-        'Missing': missing.values,
-        'Percentage': missing_pct.values
+        'Column': df.columns,
+        'Missing': missing,
+        'Percentage': missing_pct
     })
     
     missing_df = missing_df[missing_df['Missing'] > 0].sort_values('Missing', ascending=False)
@@ -74,7 +197,7 @@ def check_missing_values(df: pd.DataFrame, name: str = "Dataset") -> Dict:
         print(f"✓ No missing values in {name}")
     
     return {
-        'total_missing': missing.sum(),
+        'total_missing': int(missing.sum()),
         'columns_with_missing': len(missing_df),
         'details': missing_df
     }
@@ -92,14 +215,58 @@ def normalize_column(series: pd.Series, min_val: float = 0, max_val: float = 100
     Returns:
         Normalized series
     """
-    series_min = series.min()
-    series_max = series.max()
+    arr = np.asarray(series, dtype=np.float64)
+    if arr.size == 0 or np.isnan(arr).all():
+        return pd.Series(arr, index=series.index, copy=True)
+    
+    series_min = np.nanmin(arr)
+    series_max = np.nanmax(arr)
     
     if series_max == series_min:
-        return pd.Series([min_val] * len(series), index=series.index)
+        return pd.Series(np.full(arr.shape, min_val, dtype=np.float64), index=series.index, copy=False)
+    
+    # Scale in place on a single working buffer
+    normalized = arr - series_min
+    np.multiply(normalized, (max_val - min_val) / (series_max - series_min), out=normalized)
+    np.add(normalized, min_val, out=normalized)
+    return pd.Series(normalized, index=series.index, copy=False)
+
+
+def downcast_counts(df: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    """
+    Downcast the numeric non-key columns of a DataFrame to float32
     
-    normalized = min_val + (series - series_min) * (max_val - min_val) / (series_max - series_min)
-    return normalized
+    Args:
+        df: DataFrame of counts
+        keys: Key columns to leave untouched
+        
+    Returns:
+        DataFrame with float32 value columns; the input itself is returned
+        when there is nothing to downcast, so callers must not mutate it
+    """
+    value_cols = [
+        col for col in df.select_dtypes(include=[np.number]).columns
+        if col not in keys and df[col].dtype != np.float32
+    ]
+    if not value_cols:
+        return df
+    return df.astype({col: np.float32 for col in value_cols})
+
+
+def row_contiguous(df: pd.DataFrame, cols: List[str], dtype=np.float32) -> np.ndarray:
+    """
+    Extract columns as a C-contiguous 2D array for row-wise reductions
+    
+    Args:
+        df: Source DataFrame
+        cols: Columns to extract
+        dtype: Target dtype of the array
+        
+    Returns:
+        Row-major array of shape (len(df), len(cols))
+    """
+    arr = df[cols].to_numpy(dtype=dtype)
+    return arr if arr.flags.c_contiguous else np.ascontiguousarray(arr)
 
 
 def validate_dataframe(df: pd.DataFrame, required_columns: List[str], name: str = "Dataset") -> bool:
@@ -141,7 +308,8 @@ def aggregate_by_geography(df: pd.DataFrame,
     """
     agg_dict = {col: agg_func for col in value_cols}
     
-    aggregated = df.groupby(group_cols, as_index=False).agg(agg_dict)
+    # observed=True: categorical keys only produce groups that actually occur
+    aggregated = df.groupby(group_cols, as_index=False, observed=True).agg(agg_dict)
     
     print(f"✓ Aggregated from {len(df)} to {len(aggregated)} rows")
     return aggregated
@@ -159,7 +327,12 @@ def calculate_percentile_rank(df: pd.DataFrame, column: str, ascending: bool = F
     Returns:
         Series with percentile ranks (0-100)
     """
-    return df[column].rank(pct=True, ascending=ascending) * 100
+    arr = df[column].to_numpy(dtype=np.float64)
+    ranks = rankdata(arr if ascending else -arr, method='average', nan_policy='omit')
+    
+    # Like rank(pct=True): NaNs stay NaN and are excluded from the denominator
+    n_valid = np.count_nonzero(~np.isnan(arr))
+    return pd.Series(ranks / n_valid * 100, index=df.index)
 
 
 def detect_outliers(series: pd.Series, method: str = 'iqr', threshold: float = 1.5) -> pd.Series:
@@ -174,21 +347,23 @@ def detect_outliers(series: pd.Series, method: str = 'iqr', threshold: float = 1
     Returns:
         Boolean series indicating outliers
     """
+    arr = series.to_numpy(dtype=np.float64)
+    
     if method == 'iqr':
-        Q1 = series.quantile(0.25)
-        Q3 = series.quantile(0.75)
+        Q1, Q3 = np.nanpercentile(arr, [25, 75])
         IQR = Q3 - Q1
         lower_bound = Q1 - threshold * IQR
         upper_bound = Q3 + threshold * IQR
-        outliers = (series < lower_bound) | (series > upper_bound)
+        outliers = (arr < lower_bound) | (arr > upper_bound)
         
     elif method == 'zscore':
-        z_scores = np.abs((series - series.mean()) / series.std())
+        z_scores = np.abs((arr - np.nanmean(arr)) / np.nanstd(arr, ddof=1))
         outliers = z_scores > threshold
         
     else:
         raise ValueError(f"Unknown method: {method}. Use 'iqr' or 'zscore'")
     
+    outliers = pd.Series(outliers, index=series.index)
     outlier_count = outliers.sum()
     if outlier_count > 0:
         print(f"⚠ Detected {outlier_count} outliers ({outlier_count/len(series)*100:.2f}%)")
@@ -209,22 +384,84 @@ def create_time_features(df: pd.DataFrame, period_col: str = 'period') -> pd.Dat
     """
     df = df.copy()
     
-    # Convert period to datetime
-    df['date'] = pd.to_datetime(df[period_col], format='%Y-%m')
+    # Parse YYYY-MM periods directly at monthly frequency
+    dates = pd.PeriodIndex(df[period_col].astype('string'), freq='M').to_timestamp()
+    df['date'] = dates
     
     # Extract features
-    df['year'] = df['date'].dt.year
-    df['month'] = df['date'].dt.month
-    df['quarter'] = df['date'].dt.quarter
-    df['month_name'] = df['date'].dt.strftime('%B')
+    df['year'] = dates.year
+    df['month'] = dates.month
+    df['quarter'] = dates.quarter
+    df['month_name'] = dates.strftime('%B')
     
-    # Calculate time-based metrics
-    df['months_since_start'] = (df['date'] - df['date'].min()).dt.days / 30.44
+    # Calculate time-based metrics (whole calendar months since the first period)
+    month_index = dates.year * 12 + dates.month
+    df['months_since_start'] = month_index - month_index.min()
     
     print(f"✓ Created time features from {period_col}")
     return df
 
 
+@njit(parallel=True, cache=True)
+def column_moments(arr: np.ndarray):
+    """
+    Per-column count, mean, min, max and central moment sums, skipping NaNs
+    
+    Args:
+        arr: 2D float64 array, one column per variable
+        
+    Returns:
+        Tuple of (count, mean, min, max, m2, m3, m4) arrays, where m2-m4 are
+        sums of squared/cubed/fourth-power deviations from the mean
+    """
+    n_rows, n_cols = arr.shape
+    count = np.zeros(n_cols)
+    mean = np.full(n_cols, np.nan)
+    min_ = np.full(n_cols, np.nan)
+    max_ = np.full(n_cols, np.nan)
+    m2 = np.zeros(n_cols)
+    m3 = np.zeros(n_cols)
+    m4 = np.zeros(n_cols)
+    
+    for j in prange(n_cols):
+        total = 0.0
+        n = 0
+        lo = np.inf
+        hi = -np.inf
+        for i in range(n_rows):
+            value = arr[i, j]
+            if not np.isnan(value):
+                total += value
+                n += 1
+                lo = min(lo, value)
+                hi = max(hi, value)
+        if n == 0:
+            continue
+        
+        mu = total / n
+        s2 = 0.0
+        s3 = 0.0
+        s4 = 0.0
+        for i in range(n_rows):
+            value = arr[i, j]
+            if not np.isnan(value):
+                dev = value - mu
+                dev2 = dev * dev
+                s2 += dev2
+                s3 += dev2 * dev
+                s4 += dev2 * dev2
+        
+        count[j] = n
+        mean[j] = mu
+        min_[j] = lo
+        max_[j] = hi
+        m2[j] = s2
+        m3[j] = s3
+        m4[j] = s4
+    
+    return count, mean, min_, max_, m2, m3, m4
+
+
 def summary_statistics(df: pd.DataFrame, columns: Optional[List[str]] = None) -> pd.DataFrame:
     """
     Generate comprehensive summary statistics
@@ -239,11 +476,38 @@ def summary_statistics(df: pd.DataFrame, columns: Optional[List[str]] = None) ->
     if columns is None:
         columns = df.select_dtypes(include=[np.number]).columns.tolist()
     
-    summary = df[columns].describe().T
-    summary['missing'] = df[columns].isnull().sum()
+    arr = df[columns].to_numpy(dtype=np.float64)
+    count, mean, min_, max_, m2, m3, m4 = column_moments(arr)
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        std = np.sqrt(m2 / (count - 1))
+        
+        # Bias-corrected skewness and excess kurtosis, as pandas computes them
+        skewness = count * np.sqrt(count - 1) / (count - 2) * m3 / m2 ** 1.5
+        kurtosis = (count * (count + 1) * (count - 1) * m4 / ((count - 2) * (count - 3) * m2 ** 2)
+                    - 3 * (count - 1) ** 2 / ((count - 2) * (count - 3)))
+    skewness = np.where(m2 == 0, 0.0, skewness)
+    kurtosis = np.where(m2 == 0, 0.0, kurtosis)
+    skewness[count < 3] = np.nan
+    kurtosis[count < 4] = np.nan
+    std[count < 2] = np.nan
+    
+    if arr.size:
+        with warnings.catch_warnings():
+            # All-NaN columns just get NaN quartiles, as describe() gives them
+            warnings.simplefilter('ignore', RuntimeWarning)
+            q25, q50, q75 = np.nanpercentile(arr, [25, 50, 75], axis=0)
+    else:
+        q25 = q50 = q75 = np.full(len(columns), np.nan)
+    
+    summary = pd.DataFrame({
+        'count': count, 'mean': mean, 'std': std, 'min': min_,
+        '25%': q25, '50%': q50, '75%': q75, 'max': max_
+    }, index=columns)
+    summary['missing'] = len(df) - count.astype(np.int64)
     summary['missing_pct'] = (summary['missing'] / len(df)) * 100
-    summary['skewness'] = df[columns].skew()
-    summary['kurtosis'] = df[columns].kurtosis()
+    summary['skewness'] = skewness
+    summary['kurtosis'] = kurtosis
     
     return summary.round(2)
 
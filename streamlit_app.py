@@ -7,15 +7,18 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
+import pyarrow as pa
+import pyarrow.compute as pc
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import matplotlib.pyplot as plt
-import seaborn as sns
+import plotly.io as pio
+import orjson  # noqa: F401  (required by plotly's orjson engine below)
 from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
+# Serialize figures for st.plotly_chart with orjson instead of the json module
+pio.json.config.default_engine = 'orjson'
+
 # ============================================================================
 # PAGE CONFIGURATION
 # ============================================================================
@@ -48,27 +51,122 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+# Static About & Methodology content, rendered as one HTML block
+ABOUT_OVERVIEW_HTML = """
+<h3>📖 Overview</h3>
+<p>The <strong>Aadhaar Friction Index (AFI) Dashboard</strong> provides comprehensive analysis of
+enrollment and update processes across India's districts and states.</p>
+
+<h3>Key Metrics Explained</h3>
+<p><strong>AFI (Aadhaar Friction Index)</strong></p>
+<ul>
+    <li>Score from 0-100 indicating operational friction</li>
+    <li>Higher = More problems</li>
+    <li>Combines multiple friction signals</li>
+</ul>
+<p><strong>Friction Levels</strong></p>
+<ul>
+    <li>🔴 <strong>High Friction (≥70)</strong>: Immediate action required</li>
+    <li>🟡 <strong>Medium Friction (40-70)</strong>: Monitor and improve</li>
+    <li>🟢 <strong>Low Friction (&lt;40)</strong>: Good performance</li>
+</ul>
+
+<h3>Signal Components</h3>
+<table>
+    <tr><th>Signal</th><th>Meaning</th></tr>
+    <tr><td><strong>UIS</strong></td><td>Unresolved Issues Score - problems awaiting resolution</td></tr>
+    <tr><td><strong>RIS</strong></td><td>Resolution Issues Score - problems in resolution process</td></tr>
+    <tr><td><strong>BSS</strong></td><td>Biometric Signal Score - biometric-related friction</td></tr>
+    <tr><td><strong>TSD</strong></td><td>Technical Delays Score - System latency and technical failures</td></tr>
+</table>
+
+<h3>⚠️ Hidden Risk Methodology</h3>
+<p><strong>"Hidden Risk"</strong> districts are those that might fly under the radar because their absolute volume of updates is low.
+However, when updates <em>do</em> occur, they face high friction.</p>
+<ul>
+    <li><strong>Detection Logic:</strong> Low <code>total_updates</code> percentile + High <code>AFI</code> (&gt;70).</li>
+    <li><strong>Implication:</strong> Citizens in these areas may have given up on trying to update their details due to systemic barriers (service denial), rather than a lack of demand.</li>
+</ul>
+"""
+
 # ============================================================================
 # DATA LOADING (with caching)
 # ============================================================================
 
-@st.cache_data
+TABLE_PATH = Path("outputs/tables")
+
+TABLE_FILES = {
+    'district_summary': "afi_summary_by_district",
+    'state_summary': "afi_summary_by_state",
+    'friction_signals': "friction_signal_summary",
+    'hidden_risk': "hidden_risk_table",
+    'lifecycle': "lifecycle_imbalance_table",
+    'monthly_trends': "monthly_afi_trends",
+    'top_100': "top_100_high_friction_records",
+    'friction_typology': "district_friction_typology",
+}
+
+SIGNAL_COLUMNS = ['avg_UIS', 'avg_RIS', 'avg_BSS', 'avg_TSD']
+
+# Detailed Tables page: view name -> (table key, descending sort column, row limit)
+TABLE_VIEWS = {
+    "Top 100 High Friction Records": ('top_100', None, 100),
+    "District Friction Typology": ('friction_typology', None, 100),
+    "All Districts Summary": ('district_summary', 'avg_afi', None),
+    "All States Summary": ('state_summary', 'avg_afi', None),
+    "Friction Signals by District": ('friction_signals', 'avg_UIS', None),
+    "Monthly Trends": ('monthly_trends', None, None),
+    "Lifecycle Imbalance": ('lifecycle', None, None),
+}
+
+def load_table(table_path, name):
+    """Load a table from its Parquet copy when up to date, otherwise from the CSV"""
+    csv_file = table_path / f"{name}.csv"
+    parquet_file = table_path / "parquet" / f"{name}.parquet"
+    
+    def is_fresh(path):
+        return path.exists() and (not csv_file.exists() or
+                                  path.stat().st_mtime >= csv_file.stat().st_mtime)
+    
+    if is_fresh(parquet_file):
+        return pd.read_parquet(parquet_file)
+    
+    # Parquet copies come from utils.convert_csv_to_parquet; never written here
+    return pd.read_csv(csv_file)
+
+def state_row_index(df):
+    """Map each state to the int32 row positions holding it"""
+    return {state: rows.astype(np.int32)
+            for state, rows in df.groupby('state', observed=True, sort=False).indices.items()}
+
+@st.cache_data(ttl=None)
 def load_data():
-    """Load all CSV data files"""
+    """Load all data tables (Parquet, falling back to CSV)"""
     data = {}
     
     # Define paths
-    table_path = Path("outputs/tables")
+    table_path = TABLE_PATH
     
     try:
-        data['district_summary'] = pd.read_csv(table_path / "afi_summary_by_district.csv")
-        data['state_summary'] = pd.read_csv(table_path / "afi_summary_by_state.csv")
-        data['friction_signals'] = pd.read_csv(table_path / "friction_signal_summary.csv")
-        data['hidden_risk'] = pd.read_csv(table_path / "hidden_risk_table.csv")
-        data['lifecycle'] = pd.read_csv(table_path / "lifecycle_imbalance_table.csv")
-        data['monthly_trends'] = pd.read_csv(table_path / "monthly_afi_trends.csv")
-        data['top_100'] = pd.read_csv(table_path / "top_100_high_friction_records.csv")
-        data['friction_typology'] = pd.read_csv(table_path / "district_friction_typology.csv")
+        for key, name in TABLE_FILES.items():
+            data[key] = load_table(table_path, name)
+        
+        # State filters compare integer category codes instead of strings
+        data['friction_signals'] = data['friction_signals'].astype(
+            {col: 'category' for col in ('state', 'district') if col in data['friction_signals']})
+        
+        # The four signal columns as one contiguous float32 (N, 4) matrix
+        data['signal_mat'] = np.ascontiguousarray(
+            data['friction_signals'][SIGNAL_COLUMNS].to_numpy(dtype=np.float32))
+        # Checked once so per-state reductions can skip the NaN-aware kernels
+        data['signal_has_nan'] = bool(np.isnan(data['signal_mat']).any())
+        
+        # State bar labels formatted once
+        data['state_afi_text'] = data['state_summary']['avg_afi'].round(2).to_numpy().astype(str)
+        
+        # Row positions per state, so state filters are a dict lookup + take
+        data['state_rows'] = {key: state_row_index(data[key])
+                              for key in ('friction_signals', 'district_summary')}
         
         return data
     except FileNotFoundError as e:
@@ -76,18 +174,336 @@ def load_data():
         st.info("Make sure CSV files are in `outputs/tables/` directory")
         return None
 
+@st.cache_resource(show_spinner=False)
+def get_table_views():
+    """Detailed Tables views as Arrow tables, sliced/sorted once per process;
+    held by reference so load_data's pickled payload stays small"""
+    data = load_data()
+    arrow = {key: pa.Table.from_pandas(data[key], preserve_index=False)
+             for key in {key for key, _, _ in TABLE_VIEWS.values()}}
+    return {
+        view: arrow_view(arrow[key], sort_by=sort_by, limit=limit)
+        for view, (key, sort_by, limit) in TABLE_VIEWS.items()
+    }
+
+@st.cache_data
+def get_states_list():
+    """Sorted unique states, cached alongside load_data"""
+    return sorted(load_data()['district_summary']['state'].unique())
+
+@st.cache_data(show_spinner=False)
+def get_signal_view(state):
+    """Friction signals for one state (or all) with the page's aggregates precomputed"""
+    data = load_data()
+    signals = data['friction_signals']
+    # Column views of the preloaded signal matrix feed the Parcoords directly
+    matrix = data['signal_mat']
+    if state != "All States":
+        rows = data['state_rows']['friction_signals'].get(state, np.empty(0, dtype=np.int32))
+        signals = signals.iloc[rows]
+        matrix = matrix[rows]
+    
+    # Means, mins and maxes of all four signals in one reduction each
+    if len(matrix) and data['signal_has_nan']:
+        means = np.nanmean(matrix, axis=0, dtype=np.float64)
+        mins, maxs = np.nanmin(matrix, axis=0), np.nanmax(matrix, axis=0)
+    elif len(matrix):
+        # Plain reductions run straight over the contiguous float32 rows
+        means = matrix.mean(axis=0, dtype=np.float64)
+        mins, maxs = matrix.min(axis=0), matrix.max(axis=0)
+    else:
+        means = mins = maxs = np.full(len(SIGNAL_COLUMNS), np.nan)
+    
+    return {
+        'signals': signals,
+        'means': dict(zip(SIGNAL_COLUMNS, means)),
+        'dimensions': [
+            dict(range=[mins[i], maxs[i]], label=col.split('_')[1], values=matrix[:, i])
+            for i, col in enumerate(SIGNAL_COLUMNS)
+        ],
+        'top_uis': top_k(signals, 'avg_UIS', 10)[['state', 'district', 'avg_UIS']].astype({'state': str, 'district': str}),
+        'top_bss': top_k(signals, 'avg_BSS', 10)[['state', 'district', 'avg_BSS']].astype({'state': str, 'district': str}),
+    }
+
+STATE_SORT_COLUMNS = {
+    "Average AFI": 'avg_afi',
+    "Maximum AFI": 'max_afi',
+    "Number of Districts": 'districts',
+}
+
+@st.cache_data(show_spinner=False)
+def get_state_sorts():
+    """State summary sorted once per State Comparison option, with bar labels"""
+    data = load_data()
+    state_summary = data['state_summary']
+    sorts = {}
+    for label, column in STATE_SORT_COLUMNS.items():
+        state_data = state_summary.sort_values(column, ascending=False)
+        positions = state_summary.index.get_indexer(state_data.index)
+        sorts[label] = (state_data, data['state_afi_text'][positions])
+    return sorts
+
+@st.cache_data(show_spinner=False)
+def histogram_bars(table, column, bins=30):
+    """Bin a table column with NumPy; returns bar centers, counts and widths"""
+    values = load_data()[table][column].to_numpy(dtype=np.float64)
+    counts, edges = np.histogram(values[~np.isnan(values)], bins=bins)
+    return (edges[:-1] + edges[1:]) / 2, counts, np.diff(edges)
+
+@st.cache_resource(show_spinner=False)
+def state_bubble_figure():
+    """State Comparison avg-vs-max AFI bubble chart, built once from NumPy arrays"""
+    state_summary = load_data()['state_summary']
+    avg_afi = state_summary['avg_afi'].to_numpy()
+    districts = state_summary['districts'].to_numpy()
+    
+    fig = go.Figure(go.Scattergl(
+        x=avg_afi,
+        y=state_summary['max_afi'].to_numpy(),
+        mode='markers',
+        marker=dict(
+            # Area-scaled bubbles capped at 20px, as px.scatter(size=...) draws them
+            size=districts, sizemode='area', sizeref=2.0 * np.nanmax(districts) / 20 ** 2,
+            color=avg_afi, colorscale='Reds', showscale=True,
+            colorbar=dict(title="avg_afi")
+        ),
+        customdata=districts,
+        text=state_summary['state'].astype(str).to_numpy(),
+        hovertemplate='<b>%{text}</b><br>avg_afi: %{x}<br>max_afi: %{y}'
+                      '<br>districts: %{customdata}<extra></extra>'
+    ))
+    fig.update_layout(title="State Performance (bubble size = # districts)",
+                      xaxis_title="avg_afi", yaxis_title="max_afi")
+    return fig
+
+@st.cache_resource(show_spinner=False)
+def build_parcoords_fig(state):
+    """Signal parallel-coordinates figure, built once per state selection"""
+    signal_view = get_signal_view(state)
+    fig = go.Figure(data=
+        go.Parcoords(
+            line = dict(color = signal_view['signals']['avg_UIS'],
+                       colorscale = 'Reds'),
+            dimensions = signal_view['dimensions']
+        )
+    )
+    fig.update_layout(title="Signal Patterns Across Districts", height=500)
+    return fig
+
+@st.cache_resource(show_spinner=False)
+def build_top_signal_fig(state, view_key, column, color):
+    """Horizontal bar of the top districts by one signal, built once per state"""
+    top = get_signal_view(state)[view_key]
+    fig = go.Figure(data=[go.Bar(y=top['district'], x=top[column], orientation='h', marker=dict(color=color))])
+    fig.update_layout(title="", height=400, showlegend=False)
+    return fig
+
+@st.cache_resource(show_spinner=False)
+def build_hidden_scatter_fig():
+    """Hidden Risk update-volume vs AFI scatter, built once per session"""
+    data = load_data()
+    hidden_risk = data['hidden_risk']
+    # "district, state" hover labels joined in Arrow; cast to plain string
+    # first (columns may be large_string or dictionary)
+    labels = pc.binary_join_element_wise(
+        pc.cast(pa.array(hidden_risk['district']), pa.string()),
+        pc.cast(pa.array(hidden_risk['state']), pa.string()), ', ').to_numpy(zero_copy_only=False)
+    # float32 / smallest-int copies for plotting only; the table keeps float64
+    updates = pd.to_numeric(hidden_risk['total_updates'], downcast='unsigned').to_numpy()
+    afi = hidden_risk['AFI'].to_numpy(dtype=np.float32)
+    fig = go.Figure(data=[
+        go.Scattergl(
+            x=updates,
+            y=afi,
+            mode='markers',
+            marker=dict(
+                size=8,
+                color=afi,
+                colorscale='Reds',
+                showscale=True,
+                colorbar=dict(title="AFI")
+            ),
+            text=labels,
+            hovertemplate='<b>%{text}</b><br>Updates: %{x}<br>AFI: %{y:.2f}<extra></extra>'
+        )
+    ])
+    fig.update_layout(
+        title="Hidden Risk: Update Volume vs Friction Level",
+        xaxis_title="Total Updates",
+        yaxis_title="AFI Score",
+        height=500
+    )
+    return fig
+
+@st.cache_resource(show_spinner=False)
+def build_histogram_fig(table, column, color, xaxis_title):
+    """Pre-binned histogram bar figure for one column, built once"""
+    centers, counts, widths = histogram_bars(table, column)
+    fig = go.Figure(data=[
+        go.Bar(x=centers, y=counts, width=widths, marker=dict(color=color))
+    ])
+    fig.update_layout(title="", xaxis_title=xaxis_title, yaxis_title="Count", height=400)
+    return fig
+
+@st.cache_resource(show_spinner=False)
+def build_state_avg_bar_fig(sort_by):
+    """Average AFI by state bar chart, built once per sort order"""
+    state_data, state_afi_text = get_state_sorts()[sort_by]
+    fig = go.Figure(data=[
+        go.Bar(
+            x=state_data['state'],
+            y=state_data['avg_afi'],
+            marker=dict(color=state_data['avg_afi'], colorscale='Reds'),
+            text=state_afi_text,
+            textposition='outside'
+        )
+    ])
+    fig.update_layout(
+        title="Average AFI by State",
+        xaxis_title="State",
+        yaxis_title="Average AFI",
+        height=500,
+        xaxis_tickangle=-45
+    )
+    return fig
+
+@st.cache_resource(show_spinner=False)
+def build_trends_fig():
+    """Trends page figures (monthly AFI, districts reporting, lifecycle
+    volumes and ratio), built once per session"""
+    data = load_data()
+    monthly_trends = data['monthly_trends']
+    lifecycle = data['lifecycle']
+    
+    afi_fig = go.Figure()
+    afi_fig.add_trace(go.Scatter(
+        x=monthly_trends['period'],
+        y=monthly_trends['avg_afi'],
+        mode='lines+markers',
+        name='Average AFI',
+        line=dict(color='#3b82f6', width=3),
+        marker=dict(size=8)
+    ))
+    afi_fig.add_trace(go.Scatter(
+        x=monthly_trends['period'],
+        y=monthly_trends['median_afi'],
+        mode='lines+markers',
+        name='Median AFI',
+        line=dict(color='#10b981', width=2, dash='dash'),
+        marker=dict(size=6)
+    ))
+    afi_fig.update_layout(title="", xaxis_title="Period", yaxis_title="AFI Score", height=400)
+    
+    reporting_fig = go.Figure(data=[
+        go.Bar(x=monthly_trends['period'], 
+              y=monthly_trends['districts_reporting'],
+              marker=dict(color='#8b5cf6'))
+    ])
+    reporting_fig.update_layout(title="", xaxis_title="Period", yaxis_title="Number of Districts", height=400)
+    
+    volume_fig = go.Figure()
+    volume_fig.add_trace(go.Scatter(
+        x=lifecycle['period'],
+        y=lifecycle['total_enrolments'],
+        mode='lines+markers',
+        name='Enrolments',
+        line=dict(color='#3b82f6', width=2)
+    ))
+    volume_fig.add_trace(go.Scatter(
+        x=lifecycle['period'],
+        y=lifecycle['total_updates'],
+        mode='lines+markers',
+        name='Total Updates',
+        line=dict(color='#ef4444', width=2)
+    ))
+    volume_fig.update_layout(title="Enrolments vs Updates", xaxis_title="Period", yaxis_title="Count", height=400)
+    
+    ratio_fig = go.Figure(data=[
+        go.Scatter(
+            x=lifecycle['period'],
+            y=lifecycle['update_to_enrolment_ratio'],
+            mode='lines+markers',
+            fill='tozeroy',
+            marker=dict(color='#f59e0b', size=8)
+        )
+    ])
+    ratio_fig.update_layout(
+        title="Update to Enrolment Ratio",
+        xaxis_title="Period",
+        yaxis_title="Ratio",
+        height=400
+    )
+    return afi_fig, reporting_fig, volume_fig, ratio_fig
+
+@st.cache_data
+def friction_band_counts():
+    """Low (<40), medium (40-70) and high (>=70) AFI counts in one pass"""
+    afi = load_data()['friction_typology']['AFI'].to_numpy(dtype=np.float64)
+    bands = np.digitize(afi[~np.isnan(afi)], [40, 70])
+    return tuple(int(n) for n in np.bincount(bands, minlength=3))
+
+def arrow_view(table, sort_by=None, limit=None):
+    """Arrow table for display, optionally sorted descending and truncated"""
+    if sort_by is not None:
+        # Missing values sort last, as with sort_values
+        table = table.take(pc.sort_indices(table, sort_keys=[(sort_by, 'descending')]))
+    if limit is not None:
+        table = table.slice(0, limit)
+    return table
+
+def encode_csv(table):
+    """CSV encoding of an Arrow table or DataFrame, in the repo's pandas CSV format"""
+    if isinstance(table, pa.Table):
+        table = table.to_pandas()
+    return table.to_csv(index=False).encode('utf-8')
+
+@st.cache_data(show_spinner=False)
+def csv_bytes(view_name):
+    """CSV encoding of a Detailed Tables view, cached per view"""
+    return encode_csv(get_table_views()[view_name])
+
+@st.cache_data(show_spinner=False)
+def get_district_view(state, risk_level):
+    """District summary filtered by state and risk level, with its display table"""
+    data = load_data()
+    filtered_df = data['district_summary']
+    if state != "All States":
+        rows = data['state_rows']['district_summary'].get(state, np.empty(0, dtype=np.int32))
+        filtered_df = filtered_df.iloc[rows]
+    
+    if risk_level == "High Friction (≥70)":
+        filtered_df = filtered_df[filtered_df['avg_afi'] >= 70]
+    elif risk_level == "Medium Friction (40-70)":
+        filtered_df = filtered_df[(filtered_df['avg_afi'] >= 40) & (filtered_df['avg_afi'] < 70)]
+    elif risk_level == "Low Friction (<40)":
+        filtered_df = filtered_df[filtered_df['avg_afi'] < 40]
+    
+    display_cols = ['state', 'district', 'avg_afi', 'max_afi', 'min_afi', 'months_observed']
+    display_df = filtered_df[display_cols].sort_values('avg_afi', ascending=False)
+    display_df.columns = ['State', 'District', 'Avg AFI', 'Max AFI', 'Min AFI', 'Months']
+    return filtered_df, display_df
+
+@st.cache_data(show_spinner=False)
+def district_csv_bytes(state, risk_level):
+    """CSV encoding of the High-Risk Districts table, cached per state / risk level"""
+    return encode_csv(get_district_view(state, risk_level)[1])
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
-def classify_friction(afi):
-    """Classify AFI score into friction levels"""
-    if afi >= 70:
-        return "🔴 High Friction"
-    elif afi >= 40:
-        return "🟡 Medium Friction"
-    else:
-        return "🟢 Low Friction"
+def top_k_indices(values, k):
+    """Positions of the k largest values, largest first (NaNs skipped)"""
+    values = np.asarray(values, dtype=np.float64)
+    valid = np.flatnonzero(~np.isnan(values))
+    if k < len(valid):
+        # Partial sort: O(n) selection, then order only the k winners
+        valid = valid[np.argpartition(-values[valid], k - 1)[:k]]
+    return valid[np.argsort(-values[valid], kind='stable')]
+
+def top_k(df, col, k):
+    """Rows with the k largest values of col, largest first (like nlargest)"""
+    return df.iloc[top_k_indices(df[col].to_numpy(), k)]
 
 def get_afi_color(afi):
     """Return color based on AFI value"""
@@ -98,49 +514,12 @@ def get_afi_color(afi):
     else:
         return "#10b981"
 
-# ============================================================================
-# SIDEBAR NAVIGATION
-# ============================================================================
-
-st.sidebar.markdown("# 📊 AFI Dashboard Navigation")
-st.sidebar.markdown("---")
-
-page = st.sidebar.radio(
-    "Select Page:",
-    [
-        "📈 Dashboard Overview",
-        "🔥 High-Risk Districts",
-        "⚙️ Friction Signal Analysis",
-        "⚠️ Hidden Risk Detection",
-        "📋 State Comparison",
-        "📅 Trends & Timeline",
-        "📊 Detailed Tables",
-        "ℹ️ About & Methodology"
-    ]
-)
-
-st.sidebar.markdown("---")
-st.sidebar.markdown("### Filter Options")
-
-# Load data
-data = load_data()
-
-if data is None:
-    st.error("Failed to load data. Please check your file paths.")
-    st.stop()
-
-# Get unique values for filters
-states_list = sorted(data['district_summary']['state'].unique())
-selected_state = st.sidebar.selectbox(
-    "Select State:",
-    ["All States"] + states_list
-)
-
 # ============================================================================
 # PAGE: DASHBOARD OVERVIEW
 # ============================================================================
 
-if page == "📈 Dashboard Overview":
+def render_overview(data, selected_state):
+    """Executive dashboard: KPIs, AFI distribution and top districts"""
     st.markdown('<div class="header-title">📊 Aadhaar Friction Index - Executive Dashboard</div>', 
                 unsafe_allow_html=True)
     st.markdown("Real-time monitoring and actionable insights for friction management")
@@ -148,9 +527,7 @@ if page == "📈 Dashboard Overview":
     
     # Calculate summary metrics
     all_afi = data['district_summary']['avg_afi']
-    high_friction_count = len(data['friction_typology'][data['friction_typology']['AFI'] >= 70])
-    medium_friction_count = len(data['friction_typology'][
-        (data['friction_typology']['AFI'] >= 40) & (data['friction_typology']['AFI'] < 70)])
+    low_friction_count, medium_friction_count, high_friction_count = friction_band_counts()
     
     # Display KPIs
     col1, col2, col3, col4, col5 = st.columns(5)
@@ -194,10 +571,9 @@ if page == "📈 Dashboard Overview":
     
     with col2:
         st.subheader("🔴 Friction Classification")
-        friction_dist = data['friction_typology']['AFI'].apply(classify_friction).value_counts()
         fig = go.Figure(data=[go.Pie(
-            labels=friction_dist.index,
-            values=friction_dist.values,
+            labels=["🔴 High Friction", "🟡 Medium Friction", "🟢 Low Friction"],
+            values=[high_friction_count, medium_friction_count, low_friction_count],
             marker=dict(colors=['#ef4444', '#f59e0b', '#10b981'])
         )])
         fig.update_layout(title="Districts by Friction Level", height=400)
@@ -205,11 +581,12 @@ if page == "📈 Dashboard Overview":
     
     # Top districts
     st.subheader("🏆 Top 15 High-Risk Districts")
-    top_15 = data['district_summary'].nlargest(15, 'avg_afi')[['state', 'district', 'avg_afi', 'max_afi', 'months_observed']]
+    top_15 = top_k(data['district_summary'], 'avg_afi', 15)[['state', 'district', 'avg_afi', 'max_afi', 'months_observed']]
     top_15.columns = ['State', 'District', 'Avg AFI', 'Max AFI', 'Months Observed']
+    top_15_labels = top_15['District'].astype(str).str.cat(top_15['State'].astype(str), sep=', ')
     
     fig = go.Figure(data=[
-        go.Bar(x=top_15['Avg AFI'], y=top_15['District'] + ', ' + top_15['State'],
+        go.Bar(x=top_15['Avg AFI'], y=top_15_labels,
                orientation='h', marker=dict(color=top_15['Avg AFI'], colorscale='Reds'))
     ])
     fig.update_layout(title="Top 15 Districts by Average AFI",
@@ -224,29 +601,20 @@ if page == "📈 Dashboard Overview":
 # PAGE: HIGH-RISK DISTRICTS
 # ============================================================================
 
-elif page == "🔥 High-Risk Districts":
+def render_high_risk(data, selected_state):
+    """Districts filtered by state and risk level"""
     st.markdown('<div class="header-title">🔥 Identifying High-Risk Districts</div>', 
                 unsafe_allow_html=True)
     st.markdown("Focus areas for immediate intervention")
     st.markdown("---")
     
-    # Filter by state
-    if selected_state != "All States":
-        filtered_df = data['district_summary'][data['district_summary']['state'] == selected_state]
-    else:
-        filtered_df = data['district_summary']
-    
     # Risk level selector
     risk_level = st.radio("Filter by Risk Level:", 
                           ["All Districts", "High Friction (≥70)", "Medium Friction (40-70)", "Low Friction (<40)"],
                           horizontal=True)
     
-    if risk_level == "High Friction (≥70)":
-        filtered_df = filtered_df[filtered_df['avg_afi'] >= 70]
-    elif risk_level == "Medium Friction (40-70)":
-        filtered_df = filtered_df[(filtered_df['avg_afi'] >= 40) & (filtered_df['avg_afi'] < 70)]
-    elif risk_level == "Low Friction (<40)":
-        filtered_df = filtered_df[filtered_df['avg_afi'] < 40]
+    # Filtered by state and risk level, cached on the two selections
+    filtered_df, display_df = get_district_view(selected_state, risk_level)
     
     col1, col2 = st.columns([2, 1])
     with col1:
@@ -256,6 +624,9 @@ elif page == "🔥 High-Risk Districts":
     
     st.markdown("---")
     
+    # plotly.express is only needed here, so it is imported on first visit
+    import plotly.express as px
+    
     # Interactive scatter plot
     fig = px.scatter(filtered_df, x='avg_afi', y='max_afi', 
                     size='months_observed', 
@@ -267,14 +638,10 @@ elif page == "🔥 High-Risk Districts":
     
     # Data table
     st.subheader("📊 District Details")
-    display_cols = ['state', 'district', 'avg_afi', 'max_afi', 'min_afi', 'months_observed']
-    display_df = filtered_df[display_cols].sort_values('avg_afi', ascending=False)
-    display_df.columns = ['State', 'District', 'Avg AFI', 'Max AFI', 'Min AFI', 'Months']
-    
     st.dataframe(display_df, use_container_width=True, hide_index=True)
     
-    # Download option
-    csv = display_df.to_csv(index=False)
+    # Download option (encoded once per state / risk level combination)
+    csv = district_csv_bytes(selected_state, risk_level)
     st.download_button(
         label="📥 Download as CSV",
         data=csv,
@@ -286,16 +653,15 @@ elif page == "🔥 High-Risk Districts":
 # PAGE: FRICTION SIGNAL ANALYSIS
 # ============================================================================
 
-elif page == "⚙️ Friction Signal Analysis":
+def render_signals(data, selected_state):
+    """UIS/RIS/BSS/TSD signal breakdown for the selected state"""
     st.markdown("""<div class="header-title">⚙️ What's Causing the Friction?</div>""", unsafe_allow_html=True)
     st.markdown("Analyzing UIS, RIS, BSS, TSD signals to explain AFI")
     st.markdown("---")
     
-    # Filter by state
-    if selected_state != "All States":
-        filtered_signals = data['friction_signals'][data['friction_signals']['state'] == selected_state]
-    else:
-        filtered_signals = data['friction_signals']
+    # Filter by state (cached per state along with the aggregates below)
+    signal_view = get_signal_view(selected_state)
+    signal_means = signal_view['means']
     
     # Signal explanation
     st.info("""
@@ -308,58 +674,36 @@ elif page == "⚙️ Friction Signal Analysis":
     
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("Avg UIS", f"{filtered_signals['avg_UIS'].mean():.2f}")
+        st.metric("Avg UIS", f"{signal_means['avg_UIS']:.2f}")
     with col2:
-        st.metric("Avg RIS", f"{filtered_signals['avg_RIS'].mean():.2f}")
+        st.metric("Avg RIS", f"{signal_means['avg_RIS']:.2f}")
     with col3:
-        st.metric("Avg BSS", f"{filtered_signals['avg_BSS'].mean():.2f}")
+        st.metric("Avg BSS", f"{signal_means['avg_BSS']:.2f}")
     with col4:
-        st.metric("Avg TSD", f"{filtered_signals['avg_TSD'].mean():.2f}")
+        st.metric("Avg TSD", f"{signal_means['avg_TSD']:.2f}")
     
     st.markdown("---")
     
     # Parallel coordinates plot
-    fig = go.Figure(data=
-        go.Parcoords(
-            line = dict(color = filtered_signals['avg_UIS'],
-                       colorscale = 'Reds'),
-            dimensions = list([
-                dict(range = [filtered_signals['avg_UIS'].min(), filtered_signals['avg_UIS'].max()],
-                    label = 'UIS', values = filtered_signals['avg_UIS']),
-                dict(range = [filtered_signals['avg_RIS'].min(), filtered_signals['avg_RIS'].max()],
-                    label = 'RIS', values = filtered_signals['avg_RIS']),
-                dict(range = [filtered_signals['avg_BSS'].min(), filtered_signals['avg_BSS'].max()],
-                    label = 'BSS', values = filtered_signals['avg_BSS']),
-                dict(range = [filtered_signals['avg_TSD'].min(), filtered_signals['avg_TSD'].max()],
-                    label = 'TSD', values = filtered_signals['avg_TSD'])
-            ])
-        )
-    )
-    fig.update_layout(title="Signal Patterns Across Districts", height=500)
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(build_parcoords_fig(selected_state), use_container_width=True)
     
     # Top signal drivers
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("🔴 Top UIS Districts (Unresolved Issues)")
-        top_uis = filtered_signals.nlargest(10, 'avg_UIS')[['state', 'district', 'avg_UIS']]
-        fig = go.Figure(data=[go.Bar(y=top_uis['district'], x=top_uis['avg_UIS'], orientation='h', marker=dict(color='#ef4444'))])
-        fig.update_layout(title="", height=400, showlegend=False)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(build_top_signal_fig(selected_state, 'top_uis', 'avg_UIS', '#ef4444'), use_container_width=True)
     
     with col2:
         st.subheader("🟡 Top BSS Districts (Biometric Issues)")
-        top_bss = filtered_signals.nlargest(10, 'avg_BSS')[['state', 'district', 'avg_BSS']]
-        fig = go.Figure(data=[go.Bar(y=top_bss['district'], x=top_bss['avg_BSS'], orientation='h', marker=dict(color='#f59e0b'))])
-        fig.update_layout(title="", height=400, showlegend=False)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(build_top_signal_fig(selected_state, 'top_bss', 'avg_BSS', '#f59e0b'), use_container_width=True)
 
 # ============================================================================
 # PAGE: HIDDEN RISK DETECTION
 # ============================================================================
 
-elif page == "⚠️ Hidden Risk Detection":
+def render_hidden_risk(data, selected_state):
+    """Low-update, high-friction cases"""
     st.markdown('<div class="header-title">⚠️ Hidden Risk: Low Updates ≠ Low Friction</div>', 
                 unsafe_allow_html=True)
     st.markdown("Identifying overlooked problem areas with few updates but high friction")
@@ -368,51 +712,23 @@ elif page == "⚠️ Hidden Risk Detection":
     st.metric("Hidden Risk Cases Found", len(data['hidden_risk']))
     
     # Scatter plot: Updates vs AFI
-    fig = go.Figure(data=[
-        go.Scatter(
-            x=data['hidden_risk']['total_updates'],
-            y=data['hidden_risk']['AFI'],
-            mode='markers',
-            marker=dict(
-                size=8,
-                color=data['hidden_risk']['AFI'],
-                colorscale='Reds',
-                showscale=True,
-                colorbar=dict(title="AFI")
-            ),
-            text=data['hidden_risk']['district'] + ', ' + data['hidden_risk']['state'],
-            hovertemplate='<b>%{text}</b><br>Updates: %{x}<br>AFI: %{y:.2f}<extra></extra>'
-        )
-    ])
-    fig.update_layout(
-        title="Hidden Risk: Update Volume vs Friction Level",
-        xaxis_title="Total Updates",
-        yaxis_title="AFI Score",
-        height=500
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(build_hidden_scatter_fig(), use_container_width=True)
     
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("📉 Update Distribution in Hidden Risk Cases")
-        fig = go.Figure(data=[
-            go.Histogram(x=data['hidden_risk']['total_updates'], nbinsx=30, marker=dict(color='#3b82f6'))
-        ])
-        fig.update_layout(title="", xaxis_title="Total Updates", yaxis_title="Count", height=400)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(build_histogram_fig('hidden_risk', 'total_updates', '#3b82f6', "Total Updates"),
+                        use_container_width=True)
     
     with col2:
         st.subheader("🔴 AFI Distribution in Hidden Risk")
-        fig = go.Figure(data=[
-            go.Histogram(x=data['hidden_risk']['AFI'], nbinsx=30, marker=dict(color='#ef4444'))
-        ])
-        fig.update_layout(title="", xaxis_title="AFI Score", yaxis_title="Count", height=400)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(build_histogram_fig('hidden_risk', 'AFI', '#ef4444', "AFI Score"),
+                        use_container_width=True)
     
     # Top hidden risk cases
     st.subheader("🔴 Top 20 Hidden Risk Cases")
-    top_hidden = data['hidden_risk'].nlargest(20, 'AFI')[['state', 'district', 'period', 'total_updates', 'AFI']]
+    top_hidden = top_k(data['hidden_risk'], 'AFI', 20)[['state', 'district', 'period', 'total_updates', 'AFI']]
     top_hidden.columns = ['State', 'District', 'Period', 'Total Updates', 'AFI']
     st.dataframe(top_hidden, use_container_width=True, hide_index=True)
 
@@ -420,7 +736,8 @@ elif page == "⚠️ Hidden Risk Detection":
 # PAGE: STATE COMPARISON
 # ============================================================================
 
-elif page == "📋 State Comparison":
+def render_state_comparison(data, selected_state):
+    """State-level AFI comparison"""
     st.markdown('<div class="header-title">📋 State-Level Analysis</div>', 
                 unsafe_allow_html=True)
     st.markdown("Comparative insights for policy and resource allocation")
@@ -430,47 +747,14 @@ elif page == "📋 State Comparison":
     
     col1, col2 = st.columns([1, 1])
     with col1:
-        sort_by = st.radio("Sort by:", ["Average AFI", "Maximum AFI", "Number of Districts"], horizontal=True)
-    
-    if sort_by == "Average AFI":
-        state_data = data['state_summary'].sort_values('avg_afi', ascending=False)
-    elif sort_by == "Maximum AFI":
-        state_data = data['state_summary'].sort_values('max_afi', ascending=False)
-    else:
-        state_data = data['state_summary'].sort_values('districts', ascending=False)
+        sort_by = st.radio("Sort by:", list(STATE_SORT_COLUMNS), horizontal=True)
     
     # Bar chart
-    fig = go.Figure(data=[
-        go.Bar(
-            x=state_data['state'],
-            y=state_data['avg_afi'],
-            marker=dict(color=state_data['avg_afi'], colorscale='Reds'),
-            text=state_data['avg_afi'].round(2),
-            textposition='outside'
-        )
-    ])
-    fig.update_layout(
-        title="Average AFI by State",
-        xaxis_title="State",
-        yaxis_title="Average AFI",
-        height=500,
-        xaxis_tickangle=-45
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(build_state_avg_bar_fig(sort_by), use_container_width=True)
     
     # Scatter: Avg vs Max
     st.subheader("📈 Average AFI vs Maximum AFI")
-    fig = px.scatter(
-        data['state_summary'],
-        x='avg_afi',
-        y='max_afi',
-        size='districts',
-        hover_data=['state', 'districts'],
-        color='avg_afi',
-        color_continuous_scale='Reds',
-        title="State Performance (bubble size = # districts)"
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(state_bubble_figure(), use_container_width=True)
     
     # Data table
     st.subheader("📊 State Summary Table")
@@ -482,45 +766,24 @@ elif page == "📋 State Comparison":
 # PAGE: TRENDS & TIMELINE
 # ============================================================================
 
-elif page == "📅 Trends & Timeline":
+def render_trends(data, selected_state):
+    """Monthly AFI and lifecycle trends"""
     st.markdown('<div class="header-title">📅 Temporal Trends Analysis</div>', 
                 unsafe_allow_html=True)
     st.markdown("Monitoring changes over time")
     st.markdown("---")
     
+    afi_fig, reporting_fig, volume_fig, ratio_fig = build_trends_fig()
+    
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("📈 Monthly AFI Trends")
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=data['monthly_trends']['period'],
-            y=data['monthly_trends']['avg_afi'],
-            mode='lines+markers',
-            name='Average AFI',
-            line=dict(color='#3b82f6', width=3),
-            marker=dict(size=8)
-        ))
-        fig.add_trace(go.Scatter(
-            x=data['monthly_trends']['period'],
-            y=data['monthly_trends']['median_afi'],
-            mode='lines+markers',
-            name='Median AFI',
-            line=dict(color='#10b981', width=2, dash='dash'),
-            marker=dict(size=6)
-        ))
-        fig.update_layout(title="", xaxis_title="Period", yaxis_title="AFI Score", height=400)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(afi_fig, use_container_width=True)
     
     with col2:
         st.subheader("📊 Districts Reporting Over Time")
-        fig = go.Figure(data=[
-            go.Bar(x=data['monthly_trends']['period'], 
-                  y=data['monthly_trends']['districts_reporting'],
-                  marker=dict(color='#8b5cf6'))
-        ])
-        fig.update_layout(title="", xaxis_title="Period", yaxis_title="Number of Districts", height=400)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(reporting_fig, use_container_width=True)
     
     # Lifecycle imbalance
     st.subheader("📋 Lifecycle Imbalance: Enrolment vs Updates")
@@ -528,118 +791,75 @@ elif page == "📅 Trends & Timeline":
     col1, col2 = st.columns(2)
     
     with col1:
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=data['lifecycle']['period'],
-            y=data['lifecycle']['total_enrolments'],
-            mode='lines+markers',
-            name='Enrolments',
-            line=dict(color='#3b82f6', width=2)
-        ))
-        fig.add_trace(go.Scatter(
-            x=data['lifecycle']['period'],
-            y=data['lifecycle']['total_updates'],
-            mode='lines+markers',
-            name='Total Updates',
-            line=dict(color='#ef4444', width=2)
-        ))
-        fig.update_layout(title="Enrolments vs Updates", xaxis_title="Period", yaxis_title="Count", height=400)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(volume_fig, use_container_width=True)
     
     with col2:
-        fig = go.Figure(data=[
-            go.Scatter(
-                x=data['lifecycle']['period'],
-                y=data['lifecycle']['update_to_enrolment_ratio'],
-                mode='lines+markers',
-                fill='tozeroy',
-                marker=dict(color='#f59e0b', size=8)
-            )
-        ])
-        fig.update_layout(
-            title="Update to Enrolment Ratio",
-            xaxis_title="Period",
-            yaxis_title="Ratio",
-            height=400
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(ratio_fig, use_container_width=True)
 
 # ============================================================================
 # PAGE: DETAILED TABLES
 # ============================================================================
 
-elif page == "📊 Detailed Tables":
+def render_tables(data, selected_state):
+    """Raw table views with CSV downloads"""
     st.markdown('<div class="header-title">📊 Detailed Data Tables</div>', 
                 unsafe_allow_html=True)
     st.markdown("---")
     
     table_view = st.selectbox(
         "Select Table to View:",
-        [
-            "Top 100 High Friction Records",
-            "District Friction Typology",
-            "All Districts Summary",
-            "All States Summary",
-            "Friction Signals by District",
-            "Monthly Trends",
-            "Lifecycle Imbalance"
-        ]
+        list(TABLE_VIEWS)
     )
+    display_df = get_table_views()[table_view]
     
     if table_view == "Top 100 High Friction Records":
         st.subheader("🔴 Top 100 Highest Friction Records")
-        display_df = data['top_100'].head(100)
         st.dataframe(display_df, use_container_width=True, hide_index=True)
-        csv = display_df.to_csv(index=False)
+        csv = csv_bytes(table_view)
         st.download_button("📥 Download Top 100", csv, "top_100_records.csv", "text/csv")
     
     elif table_view == "District Friction Typology":
         st.subheader("⚙️ District Friction Classification")
-        display_df = data['friction_typology'].head(100)
         st.dataframe(display_df, use_container_width=True, hide_index=True)
-        csv = display_df.to_csv(index=False)
+        csv = csv_bytes(table_view)
         st.download_button("📥 Download Friction Typology", csv, "friction_typology.csv", "text/csv")
     
     elif table_view == "All Districts Summary":
         st.subheader("📋 AFI Summary by District")
-        display_df = data['district_summary'].sort_values('avg_afi', ascending=False)
         st.dataframe(display_df, use_container_width=True, hide_index=True)
-        csv = display_df.to_csv(index=False)
+        csv = csv_bytes(table_view)
         st.download_button("📥 Download District Summary", csv, "district_summary.csv", "text/csv")
     
     elif table_view == "All States Summary":
         st.subheader("📋 AFI Summary by State")
-        display_df = data['state_summary'].sort_values('avg_afi', ascending=False)
         st.dataframe(display_df, use_container_width=True, hide_index=True)
-        csv = display_df.to_csv(index=False)
+        csv = csv_bytes(table_view)
         st.download_button("📥 Download State Summary", csv, "state_summary.csv", "text/csv")
     
     elif table_view == "Friction Signals by District":
         st.subheader("⚙️ Friction Signals Summary")
-        display_df = data['friction_signals'].sort_values('avg_UIS', ascending=False)
         st.dataframe(display_df, use_container_width=True, hide_index=True)
-        csv = display_df.to_csv(index=False)
+        csv = csv_bytes(table_view)
         st.download_button("📥 Download Friction Signals", csv, "friction_signals.csv", "text/csv")
     
     elif table_view == "Monthly Trends":
         st.subheader("📅 Monthly AFI Trends")
-        display_df = data['monthly_trends']
         st.dataframe(display_df, use_container_width=True, hide_index=True)
-        csv = display_df.to_csv(index=False)
+        csv = csv_bytes(table_view)
         st.download_button("📥 Download Monthly Trends", csv, "monthly_trends.csv", "text/csv")
     
     elif table_view == "Lifecycle Imbalance":
         st.subheader("📋 Lifecycle Imbalance Table")
-        display_df = data['lifecycle']
         st.dataframe(display_df, use_container_width=True, hide_index=True)
-        csv = display_df.to_csv(index=False)
+        csv = csv_bytes(table_view)
         st.download_button("📥 Download Lifecycle Data", csv, "lifecycle_imbalance.csv", "text/csv")
 
 # ============================================================================
 # PAGE: ABOUT & METHODOLOGY
 # ============================================================================
 
-elif page == "ℹ️ About & Methodology":
+def render_about(data, selected_state):
+    """Methodology and data source notes"""
     st.markdown('<div class="header-title">ℹ️ About This Dashboard</div>', 
                 unsafe_allow_html=True)
     st.markdown("---")
@@ -647,41 +867,7 @@ elif page == "ℹ️ About & Methodology":
     col1, col2 = st.columns([2, 1])
     
     with col1:
-        st.subheader("📖 Overview")
-        st.markdown("""
-        The **Aadhaar Friction Index (AFI) Dashboard** provides comprehensive analysis of 
-        enrollment and update processes across India's districts and states.
-        
-        ### Key Metrics Explained
-        
-        **AFI (Aadhaar Friction Index)**
-        - Score from 0-100 indicating operational friction
-        - Higher = More problems
-        - Combines multiple friction signals
-        
-        **Friction Levels**
-        - 🔴 **High Friction (≥70)**: Immediate action required
-        - 🟡 **Medium Friction (40-70)**: Monitor and improve
-        - 🟢 **Low Friction (<40)**: Good performance
-        
-        ### Signal Components
-        
-        | Signal | Meaning |
-        |--------|---------|
-        | **UIS** | Unresolved Issues Score - problems awaiting resolution |
-        | **RIS** | Resolution Issues Score - problems in resolution process |
-        | **BSS** | Biometric Signal Score - biometric-related friction |
-        | **TSD** | Technical Delays Score - System latency and technical failures |
-        """)
-
-        st.subheader("⚠️ Hidden Risk Methodology")
-        st.markdown("""
-        **"Hidden Risk"** districts are those that might fly under the radar because their absolute volume of updates is low. 
-        However, when updates *do* occur, they face high friction.
-        
-        * **Detection Logic:** Low `total_updates` percentile + High `AFI` (>70).
-        * **Implication:** Citizens in these areas may have given up on trying to update their details due to systemic barriers (service denial), rather than a lack of demand.
-        """)
+        st.markdown(ABOUT_OVERVIEW_HTML, unsafe_allow_html=True)
 
     with col2:
         st.markdown("### 💾 Data Sources")
@@ -705,6 +891,51 @@ elif page == "ℹ️ About & Methodology":
         # st.markdown("### 📞 Contact")
         # st.write("For specific inquiries regarding district-level data discrepancies, please contact the Data Science Team.")
 
+# ============================================================================
+# PAGE DISPATCH
+# ============================================================================
+
+# Only the selected page's render function runs on each rerun
+PAGES = {
+    "📈 Dashboard Overview": render_overview,
+    "🔥 High-Risk Districts": render_high_risk,
+    "⚙️ Friction Signal Analysis": render_signals,
+    "⚠️ Hidden Risk Detection": render_hidden_risk,
+    "📋 State Comparison": render_state_comparison,
+    "📅 Trends & Timeline": render_trends,
+    "📊 Detailed Tables": render_tables,
+    "ℹ️ About & Methodology": render_about,
+}
+
+# ============================================================================
+# SIDEBAR NAVIGATION
+# ============================================================================
+
+st.sidebar.markdown("# 📊 AFI Dashboard Navigation")
+st.sidebar.markdown("---")
+
+page = st.sidebar.radio("Select Page:", list(PAGES))
+
+st.sidebar.markdown("---")
+st.sidebar.markdown("### Filter Options")
+
+# Load data
+data = load_data()
+
+if data is None:
+    st.error("Failed to load data. Please check your file paths.")
+    st.stop()
+
+# Get unique values for filters
+states_list = get_states_list()
+selected_state = st.sidebar.selectbox(
+    "Select State:",
+    ["All States"] + states_list
+)
+
+# Render the selected page
+PAGES[page](data, selected_state)
+
 # ============================================================================
 # FOOTER
 # ============================================================================